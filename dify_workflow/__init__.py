@@ -188,9 +188,12 @@ from .completion import (
 from .migration import (
     WorkflowMigrator,
     DifyVersionMigrator,
+    MigrationCache,
     LangchainMigrator,
     MakeMigrator,
     ZapierMigrator,
+    get_migrator,
+    migrate_workflow,
 )
 
 # Testing Framework
@@ -348,9 +351,12 @@ __all__ = [
     # Migration
     "WorkflowMigrator",
     "DifyVersionMigrator",
+    "MigrationCache",
     "LangchainMigrator",
     "MakeMigrator",
     "ZapierMigrator",
+    "get_migrator",
+    "migrate_workflow",
     # Testing Framework
     "WorkflowTestSuite",
     "WorkflowTest",
@@ -371,6 +377,7 @@ __all__ = [
     "interactive",
     "from_description",
     "visualize",
+    "visualize_all",
 ]
 
 
@@ -431,3 +438,17 @@ def visualize(workflow, format: str = "ascii") -> str:
     """
     from .interactive import visualize as _visualize
     return _visualize(workflow, format)
+
+
+def visualize_all(workflow) -> dict:
+    """
+    Generate all visualization formats of the workflow concurrently.
+    
+    Args:
+        workflow: The Workflow object to visualize
+    
+    Returns:
+        Dict mapping "ascii", "tree" and "mermaid" to their output
+    """
+    from .interactive import visualize_all as _visualize_all
+    return _visualize_all(workflow)
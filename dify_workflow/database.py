@@ -3,13 +3,16 @@ Database persistence layer for workflows
 Supports SQLite, PostgreSQL with async operations
 """
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 from contextlib import asynccontextmanager
 import json
 import uuid
 
 try:
-    from sqlalchemy import create_engine, Column, String, DateTime, Text, Integer
+    from sqlalchemy import (
+        create_engine, event, func, insert, inspect, text,
+        Column, String, DateTime, Text, Integer, Float,
+    )
     from sqlalchemy.ext.declarative import declarative_base
     from sqlalchemy.orm import sessionmaker, Session
     from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
@@ -39,6 +42,8 @@ class WorkflowRecord(Base if DATABASE_AVAILABLE else object):
     version = Column(Integer, default=1)
     created_by = Column(String(100))
     is_public = Column(Integer, default=0)  # 0 = private, 1 = public
+    downloads = Column(Integer, default=0)
+    rating = Column(Float, default=0.0)
 
 
 class WorkflowDatabase:
@@ -60,12 +65,75 @@ class WorkflowDatabase:
                 self.database_url,
                 connect_args={"check_same_thread": False}
             )
+            event.listen(self._engine, "connect", self._configure_sqlite)
         else:
             self._engine = create_engine(self.database_url)
 
         Base.metadata.create_all(self._engine)
+        self._add_missing_columns()
+        self._fts_enabled = self.database_url.startswith("sqlite") and self._init_fts()
         self._session_factory = sessionmaker(bind=self._engine)
 
+    @staticmethod
+    def _configure_sqlite(dbapi_connection, connection_record):
+        """Use WAL so readers don't block the writer, and fsync less per commit"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    def _add_missing_columns(self):
+        """Add counter columns to tables created before they existed"""
+        existing = {c["name"] for c in inspect(self._engine).get_columns("workflows")}
+        missing = [
+            (name, ddl) for name, ddl in (
+                ("downloads", "INTEGER DEFAULT 0"),
+                ("rating", "FLOAT DEFAULT 0"),
+            )
+            if name not in existing
+        ]
+        if missing:
+            with self._engine.begin() as conn:
+                for name, ddl in missing:
+                    conn.execute(text(f"ALTER TABLE workflows ADD COLUMN {name} {ddl}"))
+
+    @property
+    def full_text_search(self) -> bool:
+        """Whether search_workflows is backed by the SQLite FTS5 index"""
+        return self._fts_enabled
+
+    def _init_fts(self) -> bool:
+        """Create the SQLite FTS5 index over name/description; False if unsupported"""
+        statements = [
+            # trigram tokens keep substring semantics for search queries
+            "CREATE VIRTUAL TABLE IF NOT EXISTS workflows_fts USING fts5("
+            "name, description, content='workflows', content_rowid='rowid', "
+            "tokenize='trigram')",
+            "CREATE TRIGGER IF NOT EXISTS workflows_fts_ai AFTER INSERT ON workflows BEGIN "
+            "INSERT INTO workflows_fts(rowid, name, description) "
+            "VALUES (new.rowid, new.name, new.description); END",
+            "CREATE TRIGGER IF NOT EXISTS workflows_fts_ad AFTER DELETE ON workflows BEGIN "
+            "INSERT INTO workflows_fts(workflows_fts, rowid, name, description) "
+            "VALUES ('delete', old.rowid, old.name, old.description); END",
+            "CREATE TRIGGER IF NOT EXISTS workflows_fts_au AFTER UPDATE ON workflows BEGIN "
+            "INSERT INTO workflows_fts(workflows_fts, rowid, name, description) "
+            "VALUES ('delete', old.rowid, old.name, old.description); "
+            "INSERT INTO workflows_fts(rowid, name, description) "
+            "VALUES (new.rowid, new.name, new.description); END",
+        ]
+        try:
+            with self._engine.begin() as conn:
+                exists = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'workflows_fts'"
+                )).first()
+                for statement in statements:
+                    conn.execute(text(statement))
+                if not exists:
+                    conn.execute(text("INSERT INTO workflows_fts(workflows_fts) VALUES ('rebuild')"))
+            return True
+        except Exception:
+            return False
+
     @asynccontextmanager
     async def get_session(self):
         """Get async database session"""
@@ -92,13 +160,15 @@ class WorkflowDatabase:
                       workflow_id: Optional[str] = None,
                       created_by: Optional[str] = None,
                       tags: Optional[List[str]] = None,
-                      is_public: bool = False) -> str:
-        """Save workflow to database"""
+                      is_public: bool = False,
+                      content: Optional[str] = None) -> str:
+        """Save workflow to database (content: pre-serialized JSON, if available)"""
         try:
             session = self._session_factory()
 
             # Serialize workflow
-            content = json.dumps(workflow.to_dict())
+            if content is None:
+                content = json.dumps(workflow.to_dict())
 
             # Check if workflow exists
             if workflow_id:
@@ -132,8 +202,73 @@ class WorkflowDatabase:
         except Exception as e:
             raise DatabaseError(f"Failed to save workflow: {e}")
 
-    def load_workflow(self, workflow_id: str) -> Optional[Dict[str, Any]]:
-        """Load workflow from database"""
+    def save_workflows(self, items: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        Save many workflows in one transaction.
+
+        Each item holds save_workflow() keyword arguments. New rows are
+        written with a single executemany INSERT; rows that already exist
+        are updated in the same transaction.
+        """
+        try:
+            session = self._session_factory()
+            items = list(items)
+            ids = [item.get("workflow_id") or str(uuid.uuid4()) for item in items]
+            existing = {
+                record.id: record for record in
+                session.query(WorkflowRecord).filter(WorkflowRecord.id.in_(ids))
+            }
+
+            now = datetime.utcnow()
+            rows = []
+            for workflow_id, item in zip(ids, items):
+                workflow = item["workflow"]
+                content = item.get("content") or json.dumps(workflow.to_dict())
+                tags = json.dumps(item.get("tags") or [])
+
+                record = existing.get(workflow_id)
+                if record:
+                    record.name = workflow.name
+                    record.description = workflow.description
+                    record.content = content
+                    record.tags = tags
+                    record.updated_at = now
+                    record.version += 1
+                    continue
+
+                rows.append({
+                    "id": workflow_id,
+                    "name": workflow.name,
+                    "description": workflow.description,
+                    "mode": workflow.mode,
+                    "content": content,
+                    "tags": tags,
+                    "created_by": item.get("created_by"),
+                    "is_public": 1 if item.get("is_public") else 0,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+
+            if rows:
+                session.execute(insert(WorkflowRecord), rows)
+            session.commit()
+            return ids
+
+        except Exception as e:
+            raise DatabaseError(f"Failed to save workflows: {e}")
+
+    def workflow_exists(self, workflow_id: str) -> bool:
+        """Check whether a workflow id is stored, without loading its content"""
+        try:
+            session = self._session_factory()
+            return session.query(WorkflowRecord.id).filter_by(id=workflow_id).first() is not None
+
+        except Exception as e:
+            raise DatabaseError(f"Failed to check workflow: {e}")
+
+    def load_workflow(self, workflow_id: str,
+                      parse_content: bool = True) -> Optional[Dict[str, Any]]:
+        """Load workflow from database (parse_content=False keeps content as JSON text)"""
         try:
             session = self._session_factory()
             record = session.query(WorkflowRecord).filter_by(id=workflow_id).first()
@@ -146,13 +281,15 @@ class WorkflowDatabase:
                 "name": record.name,
                 "description": record.description,
                 "mode": record.mode,
-                "content": json.loads(record.content),
+                "content": json.loads(record.content) if parse_content else record.content,
                 "tags": json.loads(record.tags) if record.tags else [],
                 "created_at": record.created_at.isoformat(),
                 "updated_at": record.updated_at.isoformat(),
                 "version": record.version,
                 "created_by": record.created_by,
-                "is_public": bool(record.is_public)
+                "is_public": bool(record.is_public),
+                "downloads": record.downloads or 0,
+                "rating": record.rating or 0.0
             }
 
         except Exception as e:
@@ -161,9 +298,9 @@ class WorkflowDatabase:
     def list_workflows(self, created_by: Optional[str] = None,
                        tags: Optional[List[str]] = None,
                        is_public: Optional[bool] = None,
-                       limit: int = 100,
+                       limit: Optional[int] = 100,
                        offset: int = 0) -> List[Dict[str, Any]]:
-        """List workflows with filtering"""
+        """List workflows with filtering (limit=None returns every match)"""
         try:
             session = self._session_factory()
             query = session.query(WorkflowRecord)
@@ -192,7 +329,9 @@ class WorkflowDatabase:
                     "updated_at": r.updated_at.isoformat(),
                     "version": r.version,
                     "created_by": r.created_by,
-                    "is_public": bool(r.is_public)
+                    "is_public": bool(r.is_public),
+                    "downloads": r.downloads or 0,
+                    "rating": r.rating or 0.0
                 }
                 for r in records
             ]
@@ -200,6 +339,53 @@ class WorkflowDatabase:
         except Exception as e:
             raise DatabaseError(f"Failed to list workflows: {e}")
 
+    def public_state(self) -> Tuple[Any, ...]:
+        """
+        Cheap fingerprint of the public workflows.
+
+        Changes when a public workflow is added, updated, deleted, downloaded
+        or rated, so callers can tell whether a snapshot is still current.
+        """
+        try:
+            session = self._session_factory()
+            return tuple(session.query(
+                func.count(WorkflowRecord.id),
+                func.max(WorkflowRecord.updated_at),
+                func.sum(WorkflowRecord.downloads),
+                func.sum(WorkflowRecord.rating),
+            ).filter_by(is_public=1).one())
+
+        except Exception as e:
+            raise DatabaseError(f"Failed to read workflow state: {e}")
+
+    def increment_downloads(self, workflow_id: str) -> bool:
+        """Atomically add one to a workflow's download counter"""
+        try:
+            session = self._session_factory()
+            updated = session.query(WorkflowRecord).filter_by(id=workflow_id).update(
+                {WorkflowRecord.downloads: WorkflowRecord.downloads + 1},
+                synchronize_session=False
+            )
+            session.commit()
+            return bool(updated)
+
+        except Exception as e:
+            raise DatabaseError(f"Failed to increment downloads: {e}")
+
+    def set_rating(self, workflow_id: str, rating: float) -> bool:
+        """Update only a workflow's rating"""
+        try:
+            session = self._session_factory()
+            updated = session.query(WorkflowRecord).filter_by(id=workflow_id).update(
+                {WorkflowRecord.rating: rating},
+                synchronize_session=False
+            )
+            session.commit()
+            return bool(updated)
+
+        except Exception as e:
+            raise DatabaseError(f"Failed to set rating: {e}")
+
     def delete_workflow(self, workflow_id: str, created_by: Optional[str] = None) -> bool:
         """Delete workflow from database"""
         try:
@@ -220,14 +406,53 @@ class WorkflowDatabase:
         except Exception as e:
             raise DatabaseError(f"Failed to delete workflow: {e}")
 
-    def search_workflows(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Search workflows by name or description"""
+    def search_workflows(self, query: str, limit: Optional[int] = 20,
+                         created_by: Optional[str] = None,
+                         is_public: Optional[bool] = None,
+                         min_rating: float = 0.0,
+                         order_by: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Search workflows by name or description.
+
+        Uses the FTS5 index on SQLite (queries of three or more characters),
+        otherwise a LIKE scan. order_by may be "downloads", "rating" or
+        "recent"; limit=None returns every match.
+        """
         try:
             session = self._session_factory()
-            records = session.query(WorkflowRecord).filter(
-                WorkflowRecord.name.contains(query) |
-                WorkflowRecord.description.contains(query)
-            ).limit(limit).all()
+            records = session.query(WorkflowRecord)
+
+            if query:
+                if self._fts_enabled and len(query) >= 3:
+                    phrase = '"' + query.replace('"', '""') + '"'
+                    records = records.filter(text(
+                        "workflows.rowid IN "
+                        "(SELECT rowid FROM workflows_fts WHERE workflows_fts MATCH :phrase)"
+                    ).bindparams(phrase=phrase))
+                else:
+                    records = records.filter(
+                        WorkflowRecord.name.contains(query) |
+                        WorkflowRecord.description.contains(query)
+                    )
+
+            if created_by:
+                records = records.filter_by(created_by=created_by)
+
+            if is_public is not None:
+                records = records.filter_by(is_public=1 if is_public else 0)
+
+            if min_rating:
+                records = records.filter(WorkflowRecord.rating >= min_rating)
+
+            sort_column = {
+                "downloads": WorkflowRecord.downloads,
+                "rating": WorkflowRecord.rating,
+                "recent": WorkflowRecord.updated_at,
+            }.get(order_by)
+            if sort_column is not None:
+                records = records.order_by(sort_column.desc(), WorkflowRecord.updated_at.desc())
+
+            records = records.limit(limit).all()
 
             return [
                 {
@@ -236,7 +461,13 @@ class WorkflowDatabase:
                     "description": r.description,
                     "mode": r.mode,
                     "tags": json.loads(r.tags) if r.tags else [],
-                    "updated_at": r.updated_at.isoformat()
+                    "created_at": r.created_at.isoformat(),
+                    "updated_at": r.updated_at.isoformat(),
+                    "version": r.version,
+                    "created_by": r.created_by,
+                    "is_public": bool(r.is_public),
+                    "downloads": r.downloads or 0,
+                    "rating": r.rating or 0.0
                 }
                 for r in records
             ]
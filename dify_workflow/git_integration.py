@@ -4,12 +4,20 @@ Track changes, create branches, and collaborate on workflows
 """
 import os
 import json
+import time
 import hashlib
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass, field
 from pathlib import Path
 
+import yaml
+
+from .nodes import serialize_nodes
+
+# Shared compact encoder for commit and branch records
+_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
 
 @dataclass
 class WorkflowCommit:
@@ -17,9 +25,11 @@ class WorkflowCommit:
     hash: str
     message: str
     author: str
-    timestamp: datetime
+    timestamp: float = field(default_factory=time.time)
     parent: Optional[str] = None
     changes: Dict[str, Any] = field(default_factory=dict)
+    parsed_nodes: Optional[List[Dict[str, Any]]] = None
+    parsed_edges: Optional[List[Dict[str, Any]]] = None
 
 
 @dataclass
@@ -27,7 +37,36 @@ class WorkflowBranch:
     """Git-like branch"""
     name: str
     head: str  # Commit hash
-    created_at: datetime = field(default_factory=datetime.now)
+    created_at: float = field(default_factory=time.time)
+
+
+def _to_epoch(value: Any) -> float:
+    """Normalize a stored timestamp to epoch seconds (older repos stored ISO strings)"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+def _format_timestamp(ts: float) -> str:
+    """Render an epoch timestamp for display"""
+    return datetime.fromtimestamp(ts).isoformat()
+
+
+def _parse_graph(content: str) -> Tuple[Optional[List[Dict[str, Any]]], Optional[List[Dict[str, Any]]]]:
+    """Extract graph nodes and edges from workflow DSL, or (None, None) if it isn't parseable"""
+    try:
+        data = yaml.safe_load(content)
+        graph = data["workflow"]["graph"]
+        return list(graph.get("nodes") or []), list(graph.get("edges") or [])
+    except (yaml.YAMLError, KeyError, TypeError, AttributeError):
+        return None, None
+
+
+def _atomic_write(path: Path, text: str):
+    """Write file via a temp sibling and os.replace so readers never see a partial write"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, path)
 
 
 class WorkflowGit:
@@ -62,11 +101,11 @@ class WorkflowGit:
             name: {
                 "name": b.name,
                 "head": b.head,
-                "created_at": b.created_at.isoformat()
+                "created_at": b.created_at
             }
             for name, b in branches.items()
         }
-        self.branches_file.write_text(json.dumps(data, indent=2))
+        _atomic_write(self.branches_file, _ENCODER.encode(data))
 
     def _load_branches(self) -> Dict[str, WorkflowBranch]:
         """Load branches from file"""
@@ -78,7 +117,7 @@ class WorkflowGit:
             name: WorkflowBranch(
                 name=d["name"],
                 head=d["head"],
-                created_at=datetime.fromisoformat(d["created_at"])
+                created_at=_to_epoch(d["created_at"])
             )
             for name, d in data.items()
         }
@@ -104,11 +143,14 @@ class WorkflowGit:
             "hash": commit.hash,
             "message": commit.message,
             "author": commit.author,
-            "timestamp": commit.timestamp.isoformat(),
+            "timestamp": commit.timestamp,
             "parent": commit.parent,
             "changes": commit.changes
         }
-        commit_file.write_text(json.dumps(data, indent=2))
+        if commit.parsed_nodes is not None:
+            data["parsed_nodes"] = commit.parsed_nodes
+            data["parsed_edges"] = commit.parsed_edges or []
+        _atomic_write(commit_file, _ENCODER.encode(data))
 
     def _load_commit(self, commit_hash: str) -> Optional[WorkflowCommit]:
         """Load commit from file"""
@@ -121,9 +163,11 @@ class WorkflowGit:
             hash=data["hash"],
             message=data["message"],
             author=data["author"],
-            timestamp=datetime.fromisoformat(data["timestamp"]),
+            timestamp=_to_epoch(data["timestamp"]),
             parent=data.get("parent"),
-            changes=data.get("changes", {})
+            changes=data.get("changes", {}),
+            parsed_nodes=data.get("parsed_nodes"),
+            parsed_edges=data.get("parsed_edges")
         )
 
     def commit(self, message: str, author: str = "Anonymous") -> str:
@@ -134,7 +178,8 @@ class WorkflowGit:
         content = self.workflow_path.read_text()
 
         # Compute hash
-        commit_hash = self._compute_hash(content + message + str(datetime.now()))
+        timestamp = time.time()
+        commit_hash = self._compute_hash(content + message + repr(timestamp))
 
         # Get parent commit
         branches = self._load_branches()
@@ -142,16 +187,20 @@ class WorkflowGit:
         parent = branches.get(current_branch, WorkflowBranch("main", "")).head
 
         # Create commit
+        parsed_nodes, parsed_edges = _parse_graph(content)
         commit = WorkflowCommit(
             hash=commit_hash,
             message=message,
             author=author,
-            timestamp=datetime.now(),
+            timestamp=timestamp,
             parent=parent,
-            changes={"workflow": content}
+            changes={"workflow": content},
+            parsed_nodes=parsed_nodes,
+            parsed_edges=parsed_edges
         )
 
-        # Save commit
+        # Save commit before moving the branch head so a crash in between
+        # leaves an unreferenced commit rather than a dangling head
         self._save_commit(commit)
 
         # Update branch head
@@ -183,9 +232,14 @@ class WorkflowGit:
 
         return commits
 
-    def diff(self, commit1: str, commit2: Optional[str] = None) -> Dict[str, Any]:
+    def diff(self, commit1: str, commit2: Optional[str] = None,
+             textual: bool = False) -> Dict[str, Any]:
         """
         Diff between two commits
+
+        Uses a node-level structural diff when both commits carry a parsed
+        graph, falling back to a unified text diff otherwise or when
+        textual=True.
         """
         c1 = self._load_commit(commit1)
         c2 = self._load_commit(commit2) if commit2 else None
@@ -193,6 +247,23 @@ class WorkflowGit:
         if not c1:
             return {"error": f"Commit {commit1} not found"}
 
+        structural = (
+            not textual
+            and c1.parsed_nodes is not None
+            and (c2 is None or c2.parsed_nodes is not None)
+        )
+        if structural:
+            old_nodes = c2.parsed_nodes if c2 else []
+            old_edges = (c2.parsed_edges or []) if c2 else []
+            return {
+                "commit1": commit1,
+                "commit2": commit2,
+                "changes": WorkflowDiff.graph_diff(
+                    old_nodes, old_edges,
+                    c1.parsed_nodes, c1.parsed_edges or []
+                )
+            }
+
         # Simple text diff
         from difflib import unified_diff
 
@@ -272,7 +343,7 @@ class WorkflowGit:
                 "name": name,
                 "head": b.head,
                 "current": name == current,
-                "created_at": b.created_at.isoformat()
+                "created_at": _format_timestamp(b.created_at)
             }
             for name, b in branches.items()
         ]
@@ -337,6 +408,23 @@ class WorkflowDiff:
         """
         Compare structure of two workflows
         """
+        return WorkflowDiff.graph_diff(
+            serialize_nodes(workflow1.nodes),
+            workflow1.edges,
+            serialize_nodes(workflow2.nodes),
+            workflow2.edges
+        )
+
+    @staticmethod
+    def graph_diff(
+        nodes1: List[Dict[str, Any]],
+        edges1: List[Dict[str, Any]],
+        nodes2: List[Dict[str, Any]],
+        edges2: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Compare two graphs given as DSL node and edge dicts
+        """
         changes = {
             "added_nodes": [],
             "removed_nodes": [],
@@ -345,28 +433,40 @@ class WorkflowDiff:
             "removed_edges": []
         }
 
-        nodes1 = {n.id: n for n in workflow1.nodes}
-        nodes2 = {n.id: n for n in workflow2.nodes}
+        data1 = {n["id"]: n.get("data", {}) for n in nodes1}
+        data2 = {n["id"]: n.get("data", {}) for n in nodes2}
 
         # Find added/removed nodes
-        for node_id in nodes2:
-            if node_id not in nodes1:
+        for node_id in data2:
+            if node_id not in data1:
                 changes["added_nodes"].append(node_id)
 
-        for node_id in nodes1:
-            if node_id not in nodes2:
+        for node_id in data1:
+            if node_id not in data2:
                 changes["removed_nodes"].append(node_id)
 
         # Find modified nodes
-        for node_id in nodes1:
-            if node_id in nodes2:
-                n1 = nodes1[node_id]
-                n2 = nodes2[node_id]
-                if n1.data != n2.data:
-                    changes["modified_nodes"].append({
-                        "id": node_id,
-                        "old": n1.data,
-                        "new": n2.data
-                    })
+        for node_id, old in data1.items():
+            new = data2.get(node_id)
+            if new is not None and old != new:
+                changes["modified_nodes"].append({
+                    "id": node_id,
+                    "old": old,
+                    "new": new
+                })
+
+        # Edges are compared by their endpoints and handles, not their IDs
+        def edge_key(e: Dict[str, Any]) -> Tuple[str, str, str, str]:
+            return (
+                e.get("source", ""),
+                e.get("target", ""),
+                e.get("sourceHandle", "source"),
+                e.get("targetHandle", "target")
+            )
+
+        keys1 = {edge_key(e) for e in edges1}
+        keys2 = {edge_key(e) for e in edges2}
+        changes["added_edges"] = [e for e in edges2 if edge_key(e) not in keys1]
+        changes["removed_edges"] = [e for e in edges1 if edge_key(e) not in keys2]
 
         return changes
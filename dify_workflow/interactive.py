@@ -10,17 +10,48 @@ Features:
 - ASCII visualization of generated workflows
 """
 
+import asyncio
+import copy
+import hashlib
 import json
+import math
 import re
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
 from .workflow import Workflow
 from .nodes import (
-    StartNode, EndNode, AnswerNode, LLMNode, HTTPNode,
+    Node, StartNode, EndNode, AnswerNode, LLMNode, HTTPNode,
     CodeNode, IfElseNode, TemplateNode, KnowledgeNode,
 )
 from .constants import NODE_ICONS, MERMAID_SHAPES
+from .logging_config import get_logger
+
+logger = get_logger("interactive")
+
+# Answers treated as "yes" for boolean questions
+_TRUTHY = frozenset({"y", "yes", "true", "1", "是", "要", "需要"})
+
+# Splits comma-separated input lists, swallowing surrounding whitespace
+_SPLIT_RE = re.compile(r"\s*,\s*")
+
+# OpenAI client classes, imported on first use since openai is an optional extra
+_OpenAI = None
+_AsyncOpenAI = None
+
+# Clarification replies lead with the flag (see SYSTEM_PROMPT), so anchoring at
+# the start of the object rules out matches inside string values
+_CLARIFICATION_RE = re.compile(
+    r'\s*\{\s*"needs_clarification"\s*:\s*true\s*,\s*"clarification_questions"\s*:\s*'
+)
+_JSON_DECODER = json.JSONDecoder()
+
+# Fallback LLM prompt pieces used when the user gives no instructions
+_DEFAULT_PROMPT_LEAD = "Process the following input:"
+_DEFAULT_PROMPT_TAIL = "Please provide a helpful response."
 
 
 @dataclass
@@ -197,6 +228,12 @@ I'll help you create a workflow step by step. Just answer a few questions.
 }
 
 
+@lru_cache(maxsize=256)
+def _var_refs(names: Tuple[str, ...], bullet: str = "") -> str:
+    """Prompt lines referencing start-node inputs; shared by every builder instance"""
+    return "\n".join([f"{bullet}{name}: {{{{#start.{name}#}}}}" for name in names])
+
+
 class InteractiveBuilder:
     """
     Guide users through workflow creation with questions.
@@ -214,6 +251,7 @@ class InteractiveBuilder:
         self.lang = lang if lang in MESSAGES else "en"
         self.messages = MESSAGES[self.lang]
         self.questions = self.messages["questions"]
+        self._handlers = self._HANDLERS[self.lang]
         
         self.intent = WorkflowIntent()
         self.current_step = 0
@@ -264,30 +302,10 @@ class InteractiveBuilder:
         # Store answer
         self.answers[question["id"]] = answer
         
-        # Process based on question type
-        if "options" in question:
-            if answer in question["options"]:
-                setattr(self.intent, question["field"], question["options"][answer])
-            else:
-                return False, self.messages["choose_options"].format(
-                    options=list(question["options"].keys())
-                )
-        
-        elif "boolean" in question:
-            value = answer.lower() in ("y", "yes", "true", "1", "是", "要", "需要")
-            setattr(self.intent, question["field"], value)
-            
-            # Check for follow-up
-            if value and "followup" in question:
-                self.pending_followup = question["followup"]
-                return True, self.messages["followups"][question["followup"]]
-        
-        elif "processor" in question:
-            processor = getattr(self, question["processor"])
-            processor(answer)
-        
-        elif "field" in question:
-            setattr(self.intent, question["field"], answer)
+        # Process with the handler compiled for this question
+        result = self._handlers[self.current_step](self, answer)
+        if result is not None:
+            return result
         
         self.current_step += 1
         
@@ -298,6 +316,52 @@ class InteractiveBuilder:
         else:
             return True, self.messages["complete"]
     
+    @classmethod
+    def _compile_questions(cls, questions: List[Dict[str, Any]]) -> List[Callable]:
+        """
+        Turn question dicts into answer handlers.
+        
+        Each handler takes (builder, answer) and returns None to advance to
+        the next question, or the (success, message) reply to send instead.
+        """
+        handlers = []
+        for question in questions:
+            field_name = question.get("field")
+            
+            if "options" in question:
+                def handle(builder, answer, field_name=field_name, options=question["options"]):
+                    if answer not in options:
+                        return False, builder.messages["choose_options"].format(
+                            options=list(options.keys())
+                        )
+                    setattr(builder.intent, field_name, options[answer])
+            
+            elif "boolean" in question:
+                def handle(builder, answer, field_name=field_name, followup=question.get("followup")):
+                    value = answer.casefold() in _TRUTHY
+                    setattr(builder.intent, field_name, value)
+                    
+                    # Check for follow-up
+                    if value and followup:
+                        builder.pending_followup = followup
+                        return True, builder.messages["followups"][followup]
+            
+            elif "processor" in question:
+                # Resolved on the builder at call time so subclass overrides apply
+                def handle(builder, answer, processor=question["processor"]):
+                    getattr(builder, processor)(answer)
+            
+            elif field_name:
+                def handle(builder, answer, field_name=field_name):
+                    setattr(builder.intent, field_name, answer)
+            
+            else:
+                def handle(builder, answer):
+                    return None
+            
+            handlers.append(handle)
+        return handlers
+    
     def parse_inputs(self, answer: str):
         """Parse comma-separated input variables"""
         if not answer:
@@ -306,8 +370,7 @@ class InteractiveBuilder:
             return
         
         variables = []
-        for var in answer.split(","):
-            var = var.strip()
+        for var in _SPLIT_RE.split(answer.strip()):
             if var:
                 # Check for type annotation like "text:string"
                 if ":" in var:
@@ -320,6 +383,10 @@ class InteractiveBuilder:
             {"name": "input" if self.lang == "en" else "输入", "type": "string", "required": True}
         ]
     
+    def _get_var_refs(self) -> str:
+        """Get prompt variable references for the current input variables"""
+        return _var_refs(tuple(v["name"] for v in self.intent.input_variables), "- ")
+    
     def is_complete(self) -> bool:
         """Check if all questions have been answered"""
         return self.current_step >= len(self.questions) and not self.pending_followup
@@ -392,10 +459,7 @@ class InteractiveBuilder:
         # Add LLM node (most workflows need this)
         if self.intent.needs_llm:
             # Build variable references for prompt
-            var_refs = "\n".join([
-                f"- {v['name']}: {{{{#start.{v['name']}#}}}}"
-                for v in self.intent.input_variables
-            ])
+            var_refs = self._get_var_refs()
             
             if self.intent.llm_prompt:
                 prompt = f"""{self.intent.llm_prompt}
@@ -403,12 +467,12 @@ class InteractiveBuilder:
 Input:
 {var_refs}"""
             else:
-                prompt = f"""{self.intent.description or 'Process the following input:'}
+                prompt = f"""{self.intent.description or _DEFAULT_PROMPT_LEAD}
 
 Input:
 {var_refs}
 
-Please provide a helpful response."""
+{_DEFAULT_PROMPT_TAIL}"""
             
             llm = LLMNode(
                 title="llm" if self.lang == "en" else "AI处理",
@@ -443,13 +507,81 @@ Please provide a helpful response."""
         return self.messages["welcome"] + self.questions[0]["question"]
 
 
+InteractiveBuilder._HANDLERS = {
+    lang: InteractiveBuilder._compile_questions(messages["questions"])
+    for lang, messages in MESSAGES.items()
+}
+
+
 # ============================================================================
 # Workflow Visualization
 # ============================================================================
 
+@lru_cache(maxsize=512)
+def _box_lines(
+    text: str, width: int,
+    h: str, v: str, tl: str, tr: str, bl: str, br: str,
+) -> Tuple[str, ...]:
+    """Render the three lines of a text box; cached since titles repeat across nodes"""
+    inner = width - 4
+    text = text[:inner]
+    horizontal = h * (width - 2)
+    return (
+        f"{tl}{horizontal}{tr}",
+        f"{v}{text:^{inner}} {v}",
+        f"{bl}{horizontal}{br}",
+    )
+
+
+def _parse_clarification(content: str) -> Optional[List[Any]]:
+    """
+    Extract clarification questions without decoding the whole reply.
+    
+    Returns None when the reply doesn't start with a clarification request,
+    in which case the caller falls back to a full parse.
+    """
+    match = _CLARIFICATION_RE.match(content)
+    if not match:
+        return None
+    try:
+        questions, _ = _JSON_DECODER.raw_decode(content, match.end())
+    except json.JSONDecodeError:
+        return None
+    return questions if isinstance(questions, list) else None
+
+
+def _is_anthropic_url(base_url: Optional[str]) -> bool:
+    """Whether an OpenAI-compatible base URL points at Anthropic's API"""
+    return bool(base_url) and "anthropic.com" in base_url.lower()
+
+
+def _parse_structured_intent(message: str) -> Optional[Dict[str, Any]]:
+    """
+    Recognize a message that already is a JSON workflow spec.
+    
+    Returns the decoded reply-shaped dict (with a "workflow" object), or None
+    if the message is ordinary text that needs the LLM.
+    """
+    stripped = message.lstrip()
+    if not stripped.startswith("{") or '"workflow"' not in stripped:
+        return None
+    try:
+        result = json.loads(stripped)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(result, dict) and isinstance(result.get("workflow"), dict):
+        return result
+    return None
+
+
 class WorkflowVisualizer:
     """Generate ASCII/text visualization of workflows"""
     
+    __slots__ = (
+        "workflow", "node_positions",
+        "_node_map", "_adjacency_ascii", "_adjacency_tree", "_start_id", "_bfs_order",
+    )
+    
     # Box drawing characters (ASCII-safe)
     BOX_H = "-"
     BOX_V = "|"
@@ -460,93 +592,124 @@ class WorkflowVisualizer:
     ARROW = "-->"
     ARROW_DOWN = "v"
     
+    # Tree icons per node type; shared with the module constants, not rebuilt per node
+    _NODE_ICONS = NODE_ICONS
+    _DEFAULT_ICON = "[+]"
+    
+    # Full Mermaid node line per node type, e.g. '    {id}(({title}))'
+    _MERMAID_NODE_TEMPLATES = {
+        node_type: "    {id}" + shape for node_type, shape in MERMAID_SHAPES.items()
+    }
+    # Mermaid edge lines, formatted straight from the edge dict
+    _MERMAID_EDGE_LABELED = "    {source} -->|{sourceHandle}| {target}"
+    _MERMAID_EDGE_PLAIN = "    {source} --> {target}"
+    # Square brackets would close Mermaid shapes early
+    _MERMAID_ESCAPE = str.maketrans("[]", "()")
+    
     def __init__(self, workflow: Workflow):
         self.workflow = workflow
         self.node_positions: Dict[str, Tuple[int, int]] = {}
-    
-    def _make_box(self, text: str, width: int = 20) -> List[str]:
-        """Create a box around text"""
-        text = text[:width-4] if len(text) > width-4 else text
-        padding = width - len(text) - 4
-        left_pad = padding // 2
-        right_pad = padding - left_pad
         
-        lines = [
-            self.BOX_TL + self.BOX_H * (width-2) + self.BOX_TR,
-            self.BOX_V + " " * left_pad + text + " " * right_pad + " " + self.BOX_V,
-            self.BOX_BL + self.BOX_H * (width-2) + self.BOX_BR,
-        ]
-        return lines
+        # Graph lookups shared by all output formats, built on first use.
+        # The workflow is treated as immutable once a visualizer renders it.
+        self._node_map: Optional[Dict[str, Node]] = None
+        self._adjacency_ascii: Optional[Dict[str, Tuple[str, ...]]] = None
+        self._adjacency_tree: Optional[Dict[str, Tuple[Tuple[str, str], ...]]] = None
+        self._start_id: Optional[str] = None
+        self._bfs_order: Optional[List[str]] = None
     
-    def to_ascii(self) -> str:
-        """Generate ASCII representation of the workflow"""
-        if not self.workflow.nodes:
-            return "(empty workflow)"
-        
-        # Build adjacency list
-        adjacency: Dict[str, List[str]] = {n.id: [] for n in self.workflow.nodes}
+    def _build_graph(self):
+        """Build the node map and both adjacency variants in one pass over edges"""
+        nodes = self.workflow.nodes
+        node_map = {n.id: n for n in nodes}
+        self._start_id = next(
+            (n.id for n in nodes if n._node_type == "start"),
+            nodes[0].id if nodes else None,
+        )
+        targets: Dict[str, List[str]] = defaultdict(list)
+        branches: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
         for edge in self.workflow.edges:
-            adjacency[edge["source"]].append(edge["target"])
-        
-        # Find start node
-        start_node = None
-        for node in self.workflow.nodes:
-            if node._node_type == "start":
-                start_node = node
-                break
+            source = edge["source"]
+            target = edge["target"]
+            targets[source].append(target)
+            branches[source].append((target, edge.get("sourceHandle", "")))
+        # Frozen as tuples: edges don't change while rendering
+        self._adjacency_ascii = {k: tuple(v) for k, v in targets.items()}
+        self._adjacency_tree = {k: tuple(v) for k, v in branches.items()}
+        # Set last: callers treat a non-None node map as "graph is ready"
+        self._node_map = node_map
+    
+    def _get_bfs_order(self) -> List[str]:
+        """Breadth-first node order from the start node, then any unreachable nodes"""
+        if self._bfs_order is not None:
+            return self._bfs_order
         
-        if not start_node:
-            start_node = self.workflow.nodes[0]
+        adjacency = self._adjacency_ascii
+        start_id = self._start_id
         
-        # BFS to get node order
-        visited = set()
+        # Mark nodes as visited when enqueued so each is queued at most once
+        visited = {start_id}
         order = []
-        queue = [start_node.id]
+        queue = deque([start_id])
         
         while queue:
-            node_id = queue.pop(0)
-            if node_id in visited:
-                continue
-            visited.add(node_id)
+            node_id = queue.popleft()
             order.append(node_id)
-            for next_id in adjacency.get(node_id, []):
+            for next_id in adjacency.get(node_id, ()):
                 if next_id not in visited:
+                    visited.add(next_id)
                     queue.append(next_id)
         
         # Add any unvisited nodes
-        for node in self.workflow.nodes:
-            if node.id not in visited:
-                order.append(node.id)
+        order.extend([n.id for n in self.workflow.nodes if n.id not in visited])
         
-        # Get node by ID
-        node_map = {n.id: n for n in self.workflow.nodes}
+        self._bfs_order = order
+        return order
+    
+    def _make_box(self, text: str, width: int = 20) -> Tuple[str, ...]:
+        """Create a box around text"""
+        return _box_lines(
+            text, width,
+            self.BOX_H, self.BOX_V, self.BOX_TL, self.BOX_TR, self.BOX_BL, self.BOX_BR,
+        )
+    
+    def to_ascii(self) -> str:
+        """Generate ASCII representation of the workflow"""
+        if not self.workflow.nodes:
+            return "(empty workflow)"
+        
+        if self._node_map is None:
+            self._build_graph()
+        node_map = self._node_map
+        order = self._get_bfs_order()
         
         # Generate visualization
-        lines = []
-        lines.append(f"Workflow: {self.workflow.name}")
-        lines.append(f"Mode: {self.workflow.mode}")
-        lines.append("=" * 50)
-        lines.append("")
+        lines = [
+            f"Workflow: {self.workflow.name}",
+            f"Mode: {self.workflow.mode}",
+            "=" * 50,
+            "",
+        ]
+        
+        make_box = self._make_box
+        append = lines.append
+        last_index = len(order) - 1
         
+        # One pre-joined string per node block (box, type label, arrow and
+        # trailing blank line) keeps the list short for large workflows
         for i, node_id in enumerate(order):
             node = node_map[node_id]
             node_type = node._node_type.upper()
-            title = node.title or node_type
             
-            # Create node box
-            box_lines = self._make_box(f"{title}", 24)
+            top, middle, bottom = make_box(node.title or node_type, 24)
             type_label = f"[{node_type}]"
-            
-            for line in box_lines:
-                lines.append("    " + line)
-            lines.append(f"    {type_label:^24}")
+            block = f"    {top}\n    {middle}\n    {bottom}\n    {type_label:^24}\n"
             
             # Add arrow if not last
-            if i < len(order) - 1:
-                lines.append("           |")
-                lines.append("           v")
+            if i < last_index:
+                block += "           |\n           v\n"
             
-            lines.append("")
+            append(block)
         
         # Add summary
         lines.append("=" * 50)
@@ -559,28 +722,27 @@ class WorkflowVisualizer:
         lines = ["graph TD"]
         
         # Define nodes
-        for node in self.workflow.nodes:
-            node_type = node._node_type
-            title = node.title or node_type
-            
-            # Escape special characters for Mermaid
-            title_escaped = title.replace('"', '"').replace('[', '(').replace(']', ')')
-            
-            shape = MERMAID_SHAPES.get(node_type, MERMAID_SHAPES["default"])
-            lines.append(f"    {node.id}{shape.format(title=title_escaped)})")
+        templates = self._MERMAID_NODE_TEMPLATES
+        default = templates["default"]
+        escape = self._MERMAID_ESCAPE
+        lines.extend([
+            templates.get(node._node_type, default).format(
+                id=node.id,
+                title=(node.title or node._node_type).translate(escape),
+            )
+            for node in self.workflow.nodes
+        ])
         
         lines.append("")
         
-        # Define edges
+        # Define edges; only if-else branches carry a label
+        labeled = self._MERMAID_EDGE_LABELED.format_map
+        plain = self._MERMAID_EDGE_PLAIN.format_map
         for edge in self.workflow.edges:
-            source = edge["source"]
-            target = edge["target"]
-            handle = edge.get("sourceHandle", "")
-            
-            if handle in ("true", "false"):
-                lines.append(f"    {source} -->|{handle}| {target}")
+            if edge.get("sourceHandle", "") in ("true", "false"):
+                lines.append(labeled(edge))
             else:
-                lines.append(f"    {source} --> {target}")
+                lines.append(plain(edge))
         
         return "\n".join(lines)
     
@@ -589,55 +751,44 @@ class WorkflowVisualizer:
         if not self.workflow.nodes:
             return "(empty workflow)"
         
-        # Build adjacency list
-        adjacency: Dict[str, List[Tuple[str, str]]] = {n.id: [] for n in self.workflow.nodes}
-        for edge in self.workflow.edges:
-            handle = edge.get("sourceHandle", "")
-            adjacency[edge["source"]].append((edge["target"], handle))
-        
-        # Find start node
-        start_node = None
-        for node in self.workflow.nodes:
-            if node._node_type == "start":
-                start_node = node
-                break
-        
-        if not start_node:
-            start_node = self.workflow.nodes[0]
-        
-        node_map = {n.id: n for n in self.workflow.nodes}
+        if self._node_map is None:
+            self._build_graph()
+        adjacency = self._adjacency_tree
+        node_map = self._node_map
         
         # Generate tree
-        lines = []
-        lines.append(f"{self.workflow.name} ({self.workflow.mode})")
-        lines.append("")
+        lines = [f"{self.workflow.name} ({self.workflow.mode})", ""]
         
         visited = set()
-        
-        def render_node(node_id: str, prefix: str = "", is_last: bool = True):
+        icons_get = self._NODE_ICONS.get
+        default_icon = self._DEFAULT_ICON
+        
+        # Depth-first walk with an explicit stack: (node_id, prefix, is_last, handle)
+        stack: List[Tuple[str, str, bool, str]] = [(self._start_id, "", True, "")]
+        while stack:
+            node_id, prefix, is_last, handle = stack.pop()
+            # The branch label belongs to the parent edge, so it is shown even
+            # when the child was already rendered through another path
+            if handle:
+                lines.append(f"{prefix}    ({handle})")
             if node_id in visited:
-                return
+                continue
             visited.add(node_id)
             
             node = node_map[node_id]
             connector = "`-- " if is_last else "|-- "
             node_type = node._node_type
-            title = node.title or node_type
             
-            icon = NODE_ICONS.get(node_type, "[+]")
+            lines.append(f"{prefix}{connector}{icons_get(node_type, default_icon)} {node.title or node_type}")
             
-            lines.append(f"{prefix}{connector}{icon} {title}")
-            
-            children = adjacency.get(node_id, [])
+            children = adjacency.get(node_id, ())
             child_prefix = prefix + ("    " if is_last else "|   ")
+            last_index = len(children) - 1
             
-            for i, (child_id, handle) in enumerate(children):
-                is_child_last = (i == len(children) - 1)
-                if handle:
-                    lines.append(f"{child_prefix}    ({handle})")
-                render_node(child_id, child_prefix, is_child_last)
-        
-        render_node(start_node.id)
+            # Push in reverse so the first child is rendered first
+            for i in range(last_index, -1, -1):
+                child_id, child_handle = children[i]
+                stack.append((child_id, child_prefix, i == last_index, child_handle))
         
         return "\n".join(lines)
 
@@ -663,17 +814,151 @@ def visualize(workflow: Workflow, format: str = "ascii") -> str:
         return viz.to_ascii()
 
 
+def visualize_all(workflow: Workflow) -> Dict[str, str]:
+    """
+    Generate ASCII, tree and Mermaid visualizations concurrently.
+    
+    Useful for UIs that show every format at once, or to overlap rendering
+    with other work such as an in-flight LLM call.
+    
+    Args:
+        workflow: The workflow to visualize
+    
+    Returns:
+        Mapping of format name ("ascii", "tree", "mermaid") to output
+    """
+    viz = WorkflowVisualizer(workflow)
+    renderers = {
+        "ascii": viz.to_ascii,
+        "tree": viz.to_tree,
+        "mermaid": viz.to_mermaid,
+    }
+    with ThreadPoolExecutor(max_workers=len(renderers)) as executor:
+        futures = {fmt: executor.submit(render) for fmt, render in renderers.items()}
+        return {fmt: future.result() for fmt, future in futures.items()}
+
+
 # ============================================================================
 # AI-powered Builder with Multi-turn Conversation
 # ============================================================================
 
+class IntentCache:
+    """
+    Cache of parsed workflow intents keyed by description and language.
+    
+    Exact repeats (ignoring case and whitespace) are always served from the
+    cache. With an `embed` function, descriptions whose embedding has cosine
+    similarity >= `similarity_threshold` with a cached one in the same
+    language also reuse its intent, skipping the LLM call entirely.
+    
+    Intents are copied on store and on lookup, so callers may modify what
+    they get back without affecting later hits.
+    
+    Args:
+        max_entries: Maximum cached intents; least recently used are evicted
+        similarity_threshold: Minimum cosine similarity for a semantic hit
+        embed: Optional function mapping text to an embedding vector
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 256,
+        similarity_threshold: float = 0.9,
+        embed: Optional[Callable[[str], List[float]]] = None,
+    ):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embed = embed
+        # key -> (lang, unit embedding or None, intent)
+        self._entries: "OrderedDict[str, Tuple[str, Optional[List[float]], Dict[str, Any]]]" = OrderedDict()
+    
+    @staticmethod
+    def _key(description: str, lang: str) -> str:
+        normalized = " ".join(description.casefold().split())
+        return hashlib.blake2b(f"{lang}\0{normalized}".encode("utf-8"), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _unit(vector: List[float]) -> List[float]:
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+    
+    def lookup(self, description: str, lang: str = "en") -> Optional[Dict[str, Any]]:
+        """Get a copy of the cached intent for the description, or None"""
+        return self.match(description, lang)[0]
+    
+    def match(
+        self, description: str, lang: str = "en"
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """
+        Like lookup(), but also return the description's unit embedding.
+        
+        The embedding is None unless one was computed; pass it to store()
+        on a miss so the description is not embedded twice.
+        """
+        key = self._key(description, lang)
+        hit = self._entries.get(key)
+        if hit is not None:
+            self._entries.move_to_end(key)
+            logger.debug("Intent cache hit (exact)")
+            return copy.deepcopy(hit[2]), hit[1]
+        
+        if self.embed is None or not self._entries:
+            return None, None
+        
+        query = self._unit(self.embed(description))
+        best_key, best_score = None, self.similarity_threshold
+        for entry_key, (entry_lang, vector, _) in self._entries.items():
+            if vector is None or entry_lang != lang:
+                continue
+            score = sum(a * b for a, b in zip(query, vector))
+            if score >= best_score:
+                best_key, best_score = entry_key, score
+        
+        if best_key is None:
+            return None, query
+        self._entries.move_to_end(best_key)
+        logger.debug(f"Intent cache hit (similarity {best_score:.3f})")
+        return copy.deepcopy(self._entries[best_key][2]), query
+    
+    def store(
+        self,
+        description: str,
+        intent: Dict[str, Any],
+        lang: str = "en",
+        vector: Optional[List[float]] = None,
+    ):
+        """Cache a copy of the intent parsed for a description (vector: from match())"""
+        if vector is None and self.embed:
+            vector = self._unit(self.embed(description))
+        key = self._key(description, lang)
+        self._entries[key] = (lang, vector, copy.deepcopy(intent))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached intents"""
+        self._entries.clear()
+
+
 class AIWorkflowBuilder:
     """
     AI-powered workflow builder using LLM for intent recognition.
     
     Supports multi-turn conversation to gather requirements.
+    
+    The system prompt is always sent first and byte-identical, so providers
+    with automatic prefix caching (OpenAI) reuse it across calls. For an
+    Anthropic base URL it is additionally marked with an ephemeral
+    cache_control breakpoint.
     """
     
+    __slots__ = (
+        "api_key", "base_url", "lang", "intent_cache", "provider", "_client", "_aclient",
+        "conversation", "current_intent",
+        "_system_msg", "_clarify_prefix", "_gen_prefix",
+    )
+    
     SYSTEM_PROMPT = """You are a workflow design assistant. Your job is to understand user requirements and convert them into a structured workflow specification.
 
 When a user describes what they want, extract:
@@ -756,7 +1041,9 @@ Only include steps that are actually needed. Be concise."""
         self, 
         api_key: Optional[str] = None, 
         base_url: Optional[str] = None,
-        lang: str = "en"
+        lang: str = "en",
+        intent_cache: Optional[IntentCache] = None,
+        provider: Optional[str] = None,
     ):
         """
         Initialize with OpenAI-compatible API.
@@ -765,41 +1052,98 @@ Only include steps that are actually needed. Be concise."""
             api_key: API key (or set OPENAI_API_KEY env var)
             base_url: Optional base URL for compatible APIs
             lang: Language ("en" or "zh")
+            intent_cache: Optional cache consulted by parse_intent and
+                build_from_description before calling the LLM
+            provider: "anthropic" or "openai"; selects the system message
+                format used for prompt caching (detected from base_url if omitted)
         """
         self.api_key = api_key
         self.base_url = base_url
         self.lang = lang
+        self.intent_cache = intent_cache
+        self.provider = provider or ("anthropic" if _is_anthropic_url(base_url) else "openai")
         self._client = None
+        self._aclient = None
+        
+        # Language-specific pieces that stay fixed for the builder's lifetime
+        zh = lang == "zh"
+        system_prompt = self.SYSTEM_PROMPT_ZH if zh else self.SYSTEM_PROMPT
+        if self.provider == "anthropic":
+            # Explicit cache breakpoint on the fixed system block
+            system_content: Any = [{
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": {"type": "ephemeral"},
+            }]
+        else:
+            # OpenAI caches matching prefixes automatically; keeping this
+            # message first and byte-identical is all it needs
+            system_content = system_prompt
+        # Never mutated after this point: any change to its bytes would
+        # invalidate the provider-side prompt cache
+        self._system_msg = {"role": "system", "content": system_content}
+        self._clarify_prefix = "我需要一些更多信息：\n\n" if zh else "I need a bit more information:\n\n"
+        self._gen_prefix = "已生成工作流：" if zh else "Generated workflow: "
         
         # Conversation history for multi-turn
         self.conversation: List[Dict[str, str]] = []
         self.current_intent: Optional[Dict[str, Any]] = None
     
+    def _client_kwargs(self) -> Dict[str, Any]:
+        """Constructor arguments shared by the sync and async clients"""
+        kwargs = {}
+        if self.api_key:
+            kwargs["api_key"] = self.api_key
+        if self.base_url:
+            kwargs["base_url"] = self.base_url
+        return kwargs
+    
     @property
     def client(self):
         """Lazy-load OpenAI client"""
+        global _OpenAI
         if self._client is None:
-            try:
-                from openai import OpenAI
-            except ImportError:
-                raise ImportError(
-                    "OpenAI package required for AI builder. "
-                    "Install with: pip install dify-workflow-generator[interactive]"
-                )
-            
-            kwargs = {}
-            if self.api_key:
-                kwargs["api_key"] = self.api_key
-            if self.base_url:
-                kwargs["base_url"] = self.base_url
+            if _OpenAI is None:
+                try:
+                    from openai import OpenAI as _OpenAI
+                except ImportError:
+                    raise ImportError(
+                        "OpenAI package required for AI builder. "
+                        "Install with: pip install dify-workflow-generator[interactive]"
+                    )
             
-            self._client = OpenAI(**kwargs)
+            self._client = _OpenAI(**self._client_kwargs())
         return self._client
     
+    @property
+    def aclient(self):
+        """Lazy-load AsyncOpenAI client"""
+        global _AsyncOpenAI
+        if self._aclient is None:
+            if _AsyncOpenAI is None:
+                try:
+                    from openai import AsyncOpenAI as _AsyncOpenAI
+                except ImportError:
+                    raise ImportError(
+                        "OpenAI package required for AI builder. "
+                        "Install with: pip install dify-workflow-generator[interactive]"
+                    )
+            
+            self._aclient = _AsyncOpenAI(**self._client_kwargs())
+        return self._aclient
+    
+    def embed(self, text: str, model: str = "text-embedding-3-small") -> List[float]:
+        """Embed text with the configured API; usable as IntentCache(embed=...)"""
+        response = self.client.embeddings.create(model=model, input=text)
+        return response.data[0].embedding
+    
     def chat(self, message: str, model: str = "gpt-4") -> Tuple[bool, str, Optional[Workflow]]:
         """
         Process a message in the conversation.
         
+        A message that is already a JSON spec with a "workflow" object (the
+        same shape the LLM replies with) is built directly without an API call.
+        
         Args:
             message: User's message
             model: LLM model to use
@@ -810,48 +1154,69 @@ Only include steps that are actually needed. Be concise."""
         # Add user message to conversation
         self.conversation.append({"role": "user", "content": message})
         
-        # Get system prompt based on language
-        system_prompt = self.SYSTEM_PROMPT_ZH if self.lang == "zh" else self.SYSTEM_PROMPT
+        # A message that already is a workflow spec skips the LLM round-trip
+        result = _parse_structured_intent(message)
+        if result is not None:
+            return self._handle_result(result)
         
         # Call LLM
-        response = self.client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                *self.conversation
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"},
-        )
+        response = self.client.chat.completions.create(**self._completion_kwargs(model))
+        return self._handle_reply(response.choices[0].message.content)
+    
+    async def achat(self, message: str, model: str = "gpt-4") -> Tuple[bool, str, Optional[Workflow]]:
+        """Async version of chat() using AsyncOpenAI"""
+        self.conversation.append({"role": "user", "content": message})
+        
+        result = _parse_structured_intent(message)
+        if result is not None:
+            return self._handle_result(result)
         
-        content = response.choices[0].message.content
+        response = await self.aclient.chat.completions.create(**self._completion_kwargs(model))
+        return self._handle_reply(response.choices[0].message.content)
+    
+    def _completion_kwargs(self, model: str) -> Dict[str, Any]:
+        """Request arguments shared by the sync and async clients"""
+        return {
+            "model": model,
+            "messages": [self._system_msg, *self.conversation],
+            "temperature": 0.3,
+            "response_format": {"type": "json_object"},
+        }
+    
+    def _handle_reply(self, content: str) -> Tuple[bool, str, Optional[Workflow]]:
+        """Record the LLM reply and turn it into a chat result"""
         self.conversation.append({"role": "assistant", "content": content})
         
+        # Fast path: only the question list is needed when clarifying
+        questions = _parse_clarification(content)
+        if questions is not None:
+            return self._clarify(questions)
+        
         try:
             result = json.loads(content)
         except json.JSONDecodeError:
             return False, "Sorry, I couldn't understand that. Please try again.", None
         
-        # Check if clarification needed
+        return self._handle_result(result)
+    
+    def _handle_result(self, result: Dict[str, Any]) -> Tuple[bool, str, Optional[Workflow]]:
+        """Ask for clarification or build the workflow from a decoded reply"""
         if result.get("needs_clarification"):
-            questions = result.get("clarification_questions", [])
-            if self.lang == "zh":
-                response_text = "我需要一些更多信息：\n\n" + "\n".join(f"- {q}" for q in questions)
-            else:
-                response_text = "I need a bit more information:\n\n" + "\n".join(f"- {q}" for q in questions)
-            return False, response_text, None
+            return self._clarify(result.get("clarification_questions", []))
         
         # Build workflow
         self.current_intent = result.get("workflow", {})
         workflow = self._build_from_intent(self.current_intent)
         
-        if self.lang == "zh":
-            response_text = f"已生成工作流：{workflow.name}\n\n" + visualize(workflow, "tree")
-        else:
-            response_text = f"Generated workflow: {workflow.name}\n\n" + visualize(workflow, "tree")
+        response_text = f"{self._gen_prefix}{workflow.name}\n\n" + visualize(workflow, "tree")
         
         return True, response_text, workflow
     
+    def _clarify(self, questions: List[Any]) -> Tuple[bool, str, Optional[Workflow]]:
+        """Format clarification questions as a chat result"""
+        response_text = self._clarify_prefix + "\n".join(f"- {q}" for q in questions)
+        return False, response_text, None
+    
     def _build_from_intent(self, intent: Dict[str, Any]) -> Workflow:
         """Build workflow from parsed intent"""
         wf = Workflow(
@@ -868,16 +1233,16 @@ Only include steps that are actually needed. Be concise."""
         last_node = start
         llm_node = None
         
+        # Inputs are the same for every step, so build their references once
+        input_names = [inp.get("name", "input") for inp in inputs]
+        input_refs = _var_refs(tuple(input_names))
+        first_input_name = input_names[0] if input_names else "input"
+        
         # Add processing steps
         for i, step in enumerate(intent.get("steps", [])):
             step_type = step.get("type", "llm")
             
             if step_type == "llm":
-                input_refs = "\n".join([
-                    f"{inp.get('name', 'input')}: {{{{#start.{inp.get('name', 'input')}#}}}}"
-                    for inp in inputs
-                ])
-                
                 prompt = f"""{step.get('prompt_hint', step.get('purpose', 'Process the input'))}
 
 {input_refs}"""
@@ -910,7 +1275,7 @@ Only include steps that are actually needed. Be concise."""
                 node = IfElseNode(
                     title=f"condition_{i}",
                     conditions=[{
-                        "variable_selector": ["start", inputs[0].get("name", "input")],
+                        "variable_selector": ["start", first_input_name],
                         "comparison_operator": "is-not-empty",
                         "value": "",
                     }]
@@ -919,7 +1284,7 @@ Only include steps that are actually needed. Be concise."""
             elif step_type == "knowledge":
                 node = KnowledgeNode(
                     title=f"knowledge_{i}",
-                    query_variable_selector=["start", inputs[0].get("name", "input")],
+                    query_variable_selector=["start", first_input_name],
                 )
             
             else:
@@ -930,7 +1295,7 @@ Only include steps that are actually needed. Be concise."""
             last_node = node
         
         # Add end/answer node
-        output_source = ["llm", "text"] if llm_node else ["start", inputs[0].get("name", "input")]
+        output_source = ["llm", "text"] if llm_node else ["start", first_input_name]
         
         if intent.get("mode") == "advanced-chat":
             end = AnswerNode(
@@ -953,12 +1318,39 @@ Only include steps that are actually needed. Be concise."""
         self.conversation = []
         self.current_intent = None
     
+    def _cached_intent(
+        self, description: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """Look up a cached intent and make it current; also return the embedding"""
+        if self.intent_cache is None:
+            return None, None
+        intent, vector = self.intent_cache.match(description, self.lang)
+        if intent is not None:
+            self.current_intent = intent
+        return intent, vector
+    
+    def _remember_intent(
+        self, description: str, complete: bool, vector: Optional[List[float]] = None
+    ):
+        """Cache the intent from a completed single-exchange conversation"""
+        if not complete or self.intent_cache is None or self.current_intent is None:
+            return
+        # After clarifying turns the intent depends on more than this message
+        user_turns = sum(1 for m in self.conversation if m["role"] == "user")
+        if user_turns == 1:
+            self.intent_cache.store(description, self.current_intent, self.lang, vector)
+    
     def parse_intent(self, user_description: str, model: str = "gpt-4") -> Dict[str, Any]:
         """
         Use LLM to parse user's natural language description into structured intent.
         (For backward compatibility)
         """
-        _, _, workflow = self.chat(user_description, model)
+        cached, vector = self._cached_intent(user_description)
+        if cached is not None:
+            return cached
+        
+        complete, _, _ = self.chat(user_description, model)
+        self._remember_intent(user_description, complete, vector)
         return self.current_intent or {}
     
     def build_from_description(
@@ -970,7 +1362,12 @@ Only include steps that are actually needed. Be concise."""
         Build a complete workflow from a natural language description.
         (For backward compatibility)
         """
+        cached, vector = self._cached_intent(description)
+        if cached is not None:
+            return self._build_from_intent(cached)
+        
         complete, _, workflow = self.chat(description, model)
+        self._remember_intent(description, complete, vector)
         if workflow:
             return workflow
         
@@ -980,6 +1377,66 @@ Only include steps that are actually needed. Be concise."""
         
         # Fallback to basic workflow
         return Workflow(name="Generated Workflow", mode="workflow")
+    
+    async def aparse_intent(self, user_description: str, model: str = "gpt-4") -> Dict[str, Any]:
+        """Async version of parse_intent()"""
+        cached, vector = self._cached_intent(user_description)
+        if cached is not None:
+            return cached
+        
+        complete, _, _ = await self.achat(user_description, model)
+        self._remember_intent(user_description, complete, vector)
+        return self.current_intent or {}
+    
+    async def abuild_from_description(
+        self,
+        description: str,
+        model: str = "gpt-4",
+    ) -> Workflow:
+        """Async version of build_from_description()"""
+        cached, vector = self._cached_intent(description)
+        if cached is not None:
+            return self._build_from_intent(cached)
+        
+        complete, _, workflow = await self.achat(description, model)
+        self._remember_intent(description, complete, vector)
+        if workflow:
+            return workflow
+        
+        if self.current_intent:
+            return self._build_from_intent(self.current_intent)
+        
+        return Workflow(name="Generated Workflow", mode="workflow")
+    
+    async def abuild_many(
+        self,
+        descriptions: List[str],
+        model: str = "gpt-4",
+        concurrency: int = 4,
+    ) -> List[Workflow]:
+        """
+        Build several workflows concurrently.
+        
+        Each description gets its own conversation so histories don't mix;
+        all of them share this builder's async client. At most `concurrency`
+        requests are in flight at once to stay within provider rate limits.
+        
+        Returns:
+            Workflows in the same order as descriptions
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        aclient = self.aclient
+        
+        async def build_one(description: str) -> Workflow:
+            builder = type(self)(
+                self.api_key, self.base_url, self.lang,
+                intent_cache=self.intent_cache, provider=self.provider,
+            )
+            builder._aclient = aclient
+            async with semaphore:
+                return await builder.abuild_from_description(description, model)
+        
+        return list(await asyncio.gather(*(build_one(d) for d in descriptions)))
 
 
 def interactive_session(lang: str = "en"):
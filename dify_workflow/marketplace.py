@@ -2,18 +2,95 @@
 Workflow marketplace for sharing and discovering workflows
 Community-driven workflow hub with ratings, tags, and search
 """
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from collections import Counter, OrderedDict, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Iterable, Sequence, Set, Tuple
 from dataclasses import dataclass, field
+from functools import cached_property
 import json
 import hashlib
 import base64
+import os
+import time
 from pathlib import Path
 
+import yaml
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from .workflow import Workflow
 from .database import WorkflowDatabase, get_database
 from .exceptions import MarketplaceError
 
+_fromiso = datetime.fromisoformat
+
+
+def _utcnow() -> datetime:
+    """Current UTC time, naive like the timestamps stored in the database"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# Stored names are "[MARKETPLACE:<category>] <name>"
+_NAME_PREFIX = "[MARKETPLACE:"
+
+# Rows per query when loading the search indexes
+_INDEX_PAGE_SIZE = 1000
+
+_CATEGORIES = (
+    "chat",
+    "nlp",
+    "content",
+    "developer",
+    "productivity",
+    "data",
+    "integration",
+    "general",
+)
+
+if ORJSON_AVAILABLE:
+    _json_loads = orjson.loads
+
+    def _json_dumps(data: Any) -> str:
+        return orjson.dumps(data).decode()
+
+    def _canonical_json(data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+    def _canonical_json(data: Any) -> bytes:
+        return json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+
+
+class _LazyWorkflowData:
+    """
+    Descriptor for WorkflowEntry.workflow_data.
+
+    Entries loaded from the database keep only the raw JSON (_serialized);
+    it is decoded on first access. Assigning new data drops the stale JSON.
+    """
+
+    def __get__(self, entry, owner=None):
+        if entry is None:
+            return None  # dataclass default
+        data = entry.__dict__.get("_workflow_data")
+        if data is None:
+            raw = entry.__dict__.get("_serialized")
+            data = entry.__dict__["_workflow_data"] = _json_loads(raw) if raw else {}
+        return data
+
+    def __set__(self, entry, data):
+        entry.__dict__["_workflow_data"] = data
+        entry.__dict__.pop("canonical_workflow", None)
+        if data is not None:
+            entry.__dict__["_serialized"] = None
+
 
 @dataclass
 class WorkflowEntry:
@@ -23,15 +100,67 @@ class WorkflowEntry:
     description: str
     author: str
     version: str
-    tags: List[str] = field(default_factory=list)
+    # Immutable defaults: constructing an entry allocates nothing it isn't given
+    tags: Sequence[str] = ()
     rating: float = 0.0
     downloads: int = 0
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    updated_at: datetime = field(default_factory=datetime.utcnow)
-    workflow_data: Dict[str, Any] = field(default_factory=dict)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    workflow_data: Dict[str, Any] = _LazyWorkflowData()
     icon: str = "🤖"
     category: str = "general"
     verified: bool = False
+    # JSON of workflow_data, serialized once and reused on every save
+    _serialized: Optional[str] = field(default=None, repr=False, compare=False)
+    # Casefolded name/description for in-memory text matching, set when indexed
+    _name_lc: str = field(default="", init=False, repr=False, compare=False)
+    _desc_lc: str = field(default="", init=False, repr=False, compare=False)
+
+    @cached_property
+    def canonical_workflow(self) -> Workflow:
+        """Workflow built once from workflow_data and shared; treat as read-only"""
+        return Workflow.from_dict(self.workflow_data)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> List["WorkflowEntry"]:
+        """
+        Build entries from database records in one pass.
+
+        A record whose "content" is still a JSON string keeps it undecoded
+        until workflow_data is first read. The category prefix added on
+        save is split back out of the stored name.
+        """
+        fromiso = _fromiso
+        prefix_len = len(_NAME_PREFIX)
+        entries = []
+        for r in records:
+            content = r.get("content")
+            raw = content if isinstance(content, str) else None
+            name = r["name"]
+            category = "general"
+            if name.startswith(_NAME_PREFIX):
+                stored_category, sep, rest = name[prefix_len:].partition("] ")
+                if sep:
+                    category, name = stored_category, rest
+            # Positional arguments skip keyword matching and the default factories
+            entries.append(cls(
+                r["id"],
+                name,
+                r.get("description", ""),
+                r.get("created_by", "unknown"),
+                str(r.get("version", "1.0.0")),
+                r.get("tags", []),
+                r.get("rating", 0.0),
+                r.get("downloads", 0),
+                fromiso(r["created_at"]),
+                fromiso(r["updated_at"]),
+                None if raw is not None else content,
+                "🤖",
+                category,
+                False,
+                raw,
+            ))
+        return entries
 
 
 @dataclass
@@ -40,17 +169,41 @@ class UserProfile:
     username: str
     display_name: str
     bio: str = ""
-    workflows: List[str] = field(default_factory=list)
-    joined_at: datetime = field(default_factory=datetime.utcnow)
+    workflows: Sequence[str] = ()
+    joined_at: Optional[datetime] = None
     reputation: int = 0
 
 
 class WorkflowMarketplace:
     """Community workflow marketplace"""
 
-    def __init__(self, db: Optional[WorkflowDatabase] = None):
+    _SORT_KEYS = {
+        "downloads": lambda e: e.downloads,
+        "rating": lambda e: e.rating,
+    }
+
+    def __init__(self, db: Optional[WorkflowDatabase] = None, cache_maxsize: int = 1024):
         self.db = db or get_database()
-        self._local_cache: Dict[str, WorkflowEntry] = {}
+        # Recently used entries, least recently used first
+        self.cache_maxsize = cache_maxsize
+        self._local_cache: "OrderedDict[str, WorkflowEntry]" = OrderedDict()
+        # Entries awaiting a batched write, keyed by id (None outside batch())
+        self._pending: Optional[Dict[str, Tuple[WorkflowEntry, Dict[str, Any]]]] = None
+        # id -> (updated_at, DSL JSON) of downloadable workflows
+        self._workflow_obj_cache: Dict[str, Tuple[datetime, str]] = {}
+
+        # Search indexes over public entries, loaded lazily from the database
+        # and reloaded whenever its public_state() fingerprint changes
+        self._index_state: Optional[Tuple[Any, ...]] = None
+        self._index_entries: Dict[str, WorkflowEntry] = {}
+        self._indexes: Dict[str, Dict[str, Set[str]]] = {
+            "tag": defaultdict(set),
+            "category": defaultdict(set),
+            "author": defaultdict(set),
+        }
+        self._tag_counter: Counter = Counter()
+        # sort_by -> (ordered ids, id -> position); dropped on any change
+        self._sorted: Dict[str, Tuple[List[str], Dict[str, int]]] = {}
 
     def publish_workflow(
         self,
@@ -58,15 +211,34 @@ class WorkflowMarketplace:
         author: str,
         tags: Optional[List[str]] = None,
         category: str = "general",
-        icon: str = "🤖"
+        icon: str = "🤖",
+        content_addressed: bool = False
     ) -> str:
-        """Publish workflow to marketplace"""
+        """
+        Publish workflow to marketplace.
+
+        With content_addressed=True the ID is a digest of the workflow DSL, so
+        publishing an identical workflow again returns the existing ID
+        instead of adding a duplicate.
+        """
         try:
-            # Generate unique ID
-            workflow_json = json.dumps(workflow.to_dict(), sort_keys=True)
-            workflow_id = hashlib.md5(
-                f"{workflow.name}:{author}:{datetime.utcnow().isoformat()}".encode()
-            ).hexdigest()[:12]
+            now = _utcnow()
+            workflow_data = workflow.to_dict()
+            serialized = None
+
+            if content_addressed:
+                canonical = _canonical_json(workflow_data)
+                workflow_id = hashlib.blake2b(canonical, digest_size=8).hexdigest()
+                if workflow_id in (self._pending or ()) or self.db.workflow_exists(workflow_id):
+                    return workflow_id
+                serialized = canonical.decode()
+            else:
+                # Generate unique ID (nanosecond clock: no date formatting,
+                # and distinct for back-to-back publishes of the same name)
+                workflow_id = hashlib.blake2b(
+                    f"{workflow.name}:{author}:{time.time_ns()}".encode(),
+                    digest_size=6
+                ).hexdigest()
 
             entry = WorkflowEntry(
                 id=workflow_id,
@@ -74,10 +246,13 @@ class WorkflowMarketplace:
                 description=workflow.description or "",
                 author=author,
                 version="1.0.0",
-                tags=tags or [],
-                workflow_data=workflow.to_dict(),
+                tags=tags or (),
+                created_at=now,
+                updated_at=now,
+                workflow_data=workflow_data,
                 icon=icon,
-                category=category
+                category=category,
+                _serialized=serialized
             )
 
             # Save to database
@@ -88,17 +263,66 @@ class WorkflowMarketplace:
         except Exception as e:
             raise MarketplaceError(f"Failed to publish workflow: {e}")
 
+    def bulk_publish(
+        self,
+        workflows: Iterable[Workflow],
+        author: str,
+        tags: Optional[List[str]] = None,
+        category: str = "general",
+        icon: str = "🤖",
+        content_addressed: bool = False
+    ) -> List[str]:
+        """Publish many workflows in a single database transaction"""
+        try:
+            with self.batch():
+                return [
+                    self.publish_workflow(
+                        workflow, author, tags, category, icon, content_addressed
+                    )
+                    for workflow in workflows
+                ]
+        except MarketplaceError:
+            raise
+        except Exception as e:
+            raise MarketplaceError(f"Failed to publish workflows: {e}")
+
+    @contextmanager
+    def batch(self):
+        """Defer entry saves made inside the block and write them in one transaction"""
+        if self._pending is not None:
+            # Nested: the outermost batch flushes
+            yield
+            return
+
+        self._pending = {}
+        try:
+            yield
+            pending = list(self._pending.values())
+        finally:
+            self._pending = None
+
+        if pending:
+            with self._own_write():
+                self.db.save_workflows(save_args for _, save_args in pending)
+                for entry, _ in pending:
+                    self._index_entry(entry)
+
     def get_workflow(self, workflow_id: str) -> Optional[WorkflowEntry]:
         """Get workflow from marketplace"""
         try:
             # Check cache first
-            if workflow_id in self._local_cache:
-                return self._local_cache[workflow_id]
+            entry = self._local_cache.get(workflow_id)
+            if entry is not None:
+                self._local_cache.move_to_end(workflow_id)
+                return entry
 
             # Load from database
             entry = self._load_entry(workflow_id)
             if entry:
                 self._local_cache[workflow_id] = entry
+                if len(self._local_cache) > self.cache_maxsize:
+                    evicted, _ = self._local_cache.popitem(last=False)
+                    self._workflow_obj_cache.pop(evicted, None)
 
             return entry
 
@@ -117,48 +341,66 @@ class WorkflowMarketplace:
     ) -> List[WorkflowEntry]:
         """Search marketplace workflows"""
         try:
-            results = []
-
-            # Get all workflows from database
-            records = self.db.list_workflows(is_public=True, limit=1000)
-
-            for record in records:
-                entry = self._record_to_entry(record)
-
-                # Apply filters
-                if query and query.lower() not in entry.name.lower() and \
-                   query.lower() not in entry.description.lower():
-                    continue
-
-                if category and entry.category != category:
-                    continue
+            self._ensure_index()
+
+            # Narrow by the indexed filters first; tags match if any is present
+            filters = []
+            if category:
+                filters.append(self._indexes["category"].get(category, set()))
+            if author:
+                filters.append(self._indexes["author"].get(author, set()))
+            if tags:
+                tag_index = self._indexes["tag"]
+                filters.append(set().union(*(tag_index.get(tag, ()) for tag in tags)))
+            if query:
+                folded = query.casefold()
+                if getattr(self.db, "full_text_search", False) and len(query) >= 3:
+                    # The database's full-text index narrows the candidates;
+                    # rows written since the snapshot was taken are indexed
+                    # as found
+                    records = self.db.search_workflows(query, limit=None, is_public=True)
+                    for entry in WorkflowEntry.from_records(
+                        r for r in records if r["id"] not in self._index_entries
+                    ):
+                        self._index_entry(entry)
+                    found = [self._index_entries[record["id"]] for record in records]
+                else:
+                    found = self._index_entries.values()
+                # Match on the unprefixed name and description either way, so
+                # the stored "[MARKETPLACE:<category>]" prefix never matches
+                filters.append({
+                    entry.id for entry in found
+                    if folded in entry._name_lc or folded in entry._desc_lc
+                })
 
-                if tags and not any(tag in entry.tags for tag in tags):
-                    continue
+            ordered, rank = self._sorted_ids(sort_by)
+            if filters:
+                candidates = set.intersection(*filters)
+                ordered = sorted(candidates & rank.keys(), key=rank.__getitem__)
 
-                if author and entry.author != author:
-                    continue
+            results = []
+            for workflow_id in ordered:
+                entry = self._index_entries[workflow_id]
 
                 if entry.rating < min_rating:
                     continue
 
                 results.append(entry)
+                if len(results) >= limit:
+                    break
 
-            # Sort results
-            if sort_by == "downloads":
-                results.sort(key=lambda x: x.downloads, reverse=True)
-            elif sort_by == "rating":
-                results.sort(key=lambda x: x.rating, reverse=True)
-            elif sort_by == "recent":
-                results.sort(key=lambda x: x.updated_at, reverse=True)
-
-            return results[:limit]
+            return results
 
         except Exception as e:
             raise MarketplaceError(f"Failed to search workflows: {e}")
 
-    def download_workflow(self, workflow_id: str) -> Optional[Workflow]:
-        """Download workflow from marketplace"""
+    def download_workflow(self, workflow_id: str, mutable: bool = True) -> Optional[Workflow]:
+        """
+        Download workflow from marketplace.
+
+        With mutable=False the entry's shared canonical instance is returned
+        instead of a private copy; callers must not modify it.
+        """
         try:
             entry = self.get_workflow(workflow_id)
             if not entry:
@@ -167,9 +409,17 @@ class WorkflowMarketplace:
             # Increment download count
             self._increment_downloads(workflow_id)
 
-            # Reconstruct workflow
-            workflow = Workflow.from_dict(entry.workflow_data)
-            return workflow
+            if not mutable:
+                return entry.canonical_workflow
+
+            # Reconstruct workflow from the cached DSL; decoding it per call
+            # gives each caller an isolated instance (several times faster
+            # than deep-copying the canonical one)
+            cached = self._workflow_obj_cache.get(workflow_id)
+            if cached is None or cached[0] != entry.updated_at:
+                serialized = entry._serialized or _json_dumps(entry.workflow_data)
+                cached = self._workflow_obj_cache[workflow_id] = (entry.updated_at, serialized)
+            return Workflow.from_dict(_json_loads(cached[1]))
 
         except Exception as e:
             raise MarketplaceError(f"Failed to download workflow: {e}")
@@ -186,8 +436,14 @@ class WorkflowMarketplace:
 
             # Calculate new rating
             # In real implementation, store individual ratings
-            entry.rating = (entry.rating * entry.downloads + rating) / (entry.downloads + 1)
-            self._save_entry(entry)
+            new_rating = (entry.rating * entry.downloads + rating) / (entry.downloads + 1)
+            with self._own_write():
+                if not self.db.set_rating(workflow_id, new_rating):
+                    return False
+
+                for cached in self._cached_entries(workflow_id):
+                    cached.rating = new_rating
+                self._invalidate_index()
 
             return True
 
@@ -196,30 +452,14 @@ class WorkflowMarketplace:
 
     def get_categories(self) -> List[str]:
         """Get available workflow categories"""
-        return [
-            "chat",
-            "nlp",
-            "content",
-            "developer",
-            "productivity",
-            "data",
-            "integration",
-            "general"
-        ]
+        return list(_CATEGORIES)
 
     def get_popular_tags(self, limit: int = 20) -> List[tuple]:
         """Get most popular tags with counts"""
         try:
-            tag_counts: Dict[str, int] = {}
-
-            workflows = self.search_workflows(limit=1000)
-            for workflow in workflows:
-                for tag in workflow.tags:
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
+            self._ensure_index()
 
-            # Sort by count
-            sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)
-            return sorted_tags[:limit]
+            return self._tag_counter.most_common(limit)
 
         except Exception as e:
             raise MarketplaceError(f"Failed to get popular tags: {e}")
@@ -231,41 +471,134 @@ class WorkflowMarketplace:
 
     def _save_entry(self, entry: WorkflowEntry):
         """Save entry to database"""
-        # Convert to dict and store
-        entry_data = {
-            "id": entry.id,
-            "name": entry.name,
-            "description": entry.description,
-            "author": entry.author,
-            "version": entry.version,
-            "tags": json.dumps(entry.tags),
-            "rating": entry.rating,
-            "downloads": entry.downloads,
-            "created_at": entry.created_at.isoformat(),
-            "updated_at": entry.updated_at.isoformat(),
-            "content": json.dumps(entry.workflow_data),
-            "icon": entry.icon,
-            "category": entry.category,
-            "verified": entry.verified,
-            "is_public": 1
-        }
+        if entry._serialized is None:
+            entry._serialized = _json_dumps(entry.workflow_data)
+        self._local_cache.pop(entry.id, None)
+        self._workflow_obj_cache.pop(entry.id, None)
 
         # This would use a dedicated marketplace table
         # For now, using the workflow table with extra metadata
         workflow = Workflow.from_dict(entry.workflow_data)
-        workflow.name = f"[MARKETPLACE:{entry.category}] {entry.name}"
-
-        self.db.save_workflow(
-            workflow=workflow,
-            workflow_id=entry.id,
-            created_by=entry.author,
-            tags=entry.tags,
-            is_public=True
-        )
+        workflow.name = f"{_NAME_PREFIX}{entry.category}] {entry.name}"
+
+        save_args = {
+            "workflow": workflow,
+            "workflow_id": entry.id,
+            "created_by": entry.author,
+            "tags": entry.tags,
+            "is_public": True,
+            "content": entry._serialized,
+        }
+        if self._pending is not None:
+            self._pending[entry.id] = (entry, save_args)
+            return
+
+        with self._own_write():
+            self.db.save_workflow(**save_args)
+            self._index_entry(entry)
+
+    def _public_state(self) -> Tuple[Any, ...]:
+        """Database fingerprint of the public entries (constant if unsupported)"""
+        public_state = getattr(self.db, "public_state", None)
+        return public_state() if public_state is not None else ()
+
+    @contextmanager
+    def _own_write(self):
+        """
+        Keep the search indexes current across a write made by this instance.
+
+        The block updates the indexes itself, so if they matched the database
+        beforehand they are marked current afterwards instead of being
+        reloaded. Writes by others in between still force a reload.
+        """
+        current = self._index_state is not None and self._public_state() == self._index_state
+        yield
+        if current:
+            self._index_state = self._public_state()
+
+    def _ensure_index(self):
+        """
+        (Re)build the search indexes from the database if another writer
+        changed it.
+
+        Databases without public_state() are loaded once and then kept
+        current only by this instance's own writes.
+        """
+        state = self._public_state()
+        if state == self._index_state:
+            return
+
+        self._index_entries.clear()
+        for index in self._indexes.values():
+            index.clear()
+        self._tag_counter.clear()
+        self._invalidate_index()
+
+        # Read in pages so no single query returns the whole catalogue
+        offset = 0
+        while True:
+            records = self.db.list_workflows(
+                is_public=True, limit=_INDEX_PAGE_SIZE, offset=offset
+            )
+            for entry in WorkflowEntry.from_records(records):
+                self._index_entry(entry)
+            if len(records) < _INDEX_PAGE_SIZE:
+                break
+            offset += _INDEX_PAGE_SIZE
+        self._index_state = state
+
+    def _index_entry(self, entry: WorkflowEntry):
+        """Add or replace an entry in the search indexes"""
+        self._unindex_entry(entry.id)
+        self._index_entries[entry.id] = entry
+        entry._name_lc = entry.name.casefold()
+        entry._desc_lc = (entry.description or "").casefold()
+        self._indexes["category"][entry.category].add(entry.id)
+        self._indexes["author"][entry.author].add(entry.id)
+        for tag in entry.tags:
+            self._indexes["tag"][tag].add(entry.id)
+        self._tag_counter.update(entry.tags)
+        self._invalidate_index()
+
+    def _unindex_entry(self, workflow_id: str):
+        """Remove an entry from the search indexes"""
+        entry = self._index_entries.pop(workflow_id, None)
+        if entry is None:
+            return
+        self._indexes["category"][entry.category].discard(workflow_id)
+        self._indexes["author"][entry.author].discard(workflow_id)
+        for tag in entry.tags:
+            self._indexes["tag"][tag].discard(workflow_id)
+            self._tag_counter[tag] -= 1
+            if self._tag_counter[tag] <= 0:
+                del self._tag_counter[tag]
+        self._invalidate_index()
+
+    def _invalidate_index(self):
+        """Drop orderings derived from entry values"""
+        self._sorted.clear()
+
+    def _sorted_ids(self, sort_by: str) -> Tuple[List[str], Dict[str, int]]:
+        """Get entry ids ordered for sort_by (most recent first for ties)"""
+        if sort_by not in self._SORT_KEYS:
+            sort_by = "recent"
+        cached = self._sorted.get(sort_by)
+        if cached is None:
+            # Entries built without timestamps sort as oldest
+            entries = sorted(
+                self._index_entries.values(),
+                key=lambda e: (e.updated_at or datetime.min, e.id),
+                reverse=True,
+            )
+            if sort_by != "recent":
+                entries.sort(key=self._SORT_KEYS[sort_by], reverse=True)
+            ids = [e.id for e in entries]
+            cached = self._sorted[sort_by] = (ids, {wid: i for i, wid in enumerate(ids)})
+        return cached
 
     def _load_entry(self, workflow_id: str) -> Optional[WorkflowEntry]:
         """Load entry from database"""
-        record = self.db.load_workflow(workflow_id)
+        record = self.db.load_workflow(workflow_id, parse_content=False)
         if not record:
             return None
 
@@ -273,34 +606,35 @@ class WorkflowMarketplace:
 
     def _record_to_entry(self, record: Dict[str, Any]) -> WorkflowEntry:
         """Convert database record to WorkflowEntry"""
-        return WorkflowEntry(
-            id=record["id"],
-            name=record["name"],
-            description=record.get("description", ""),
-            author=record.get("created_by", "unknown"),
-            version=str(record.get("version", "1.0.0")),
-            tags=record.get("tags", []),
-            created_at=datetime.fromisoformat(record["created_at"]),
-            updated_at=datetime.fromisoformat(record["updated_at"]),
-            workflow_data=record.get("content", {}),
-            category="general",
-            icon="🤖"
-        )
+        return WorkflowEntry.from_records((record,))[0]
 
     def _increment_downloads(self, workflow_id: str):
         """Increment download counter"""
-        entry = self.get_workflow(workflow_id)
-        if entry:
-            entry.downloads += 1
-            self._save_entry(entry)
+        with self._own_write():
+            if self.db.increment_downloads(workflow_id):
+                for cached in self._cached_entries(workflow_id):
+                    cached.downloads += 1
+                self._invalidate_index()
+
+    def _cached_entries(self, workflow_id: str) -> List[WorkflowEntry]:
+        """Distinct in-memory copies of an entry (detail cache and search index)"""
+        entries = []
+        for cache in (self._local_cache, self._index_entries):
+            entry = cache.get(workflow_id)
+            if entry is not None and all(entry is not e for e in entries):
+                entries.append(entry)
+        return entries
 
 
 class LocalWorkflowHub:
     """Local workflow hub for team sharing"""
 
+    INDEX_FILE = ".index.json"
+
     def __init__(self, hub_path: str = "./workflow_hub"):
         self.hub_path = Path(hub_path)
         self.hub_path.mkdir(exist_ok=True)
+        self.index_path = self.hub_path / self.INDEX_FILE
 
     def add_workflow(self, workflow: Workflow, filename: str):
         """Add workflow to local hub"""
@@ -309,22 +643,50 @@ class LocalWorkflowHub:
 
     def list_workflows(self) -> List[Dict[str, Any]]:
         """List all workflows in hub"""
+        index = self._load_index()
+        fresh: Dict[str, Dict[str, Any]] = {}
         workflows = []
 
-        for filepath in self.hub_path.glob("*.yml"):
-            try:
-                from .importer import import_workflow
-                workflow = import_workflow(str(filepath))
+        # Only files whose size or mtime changed since the last listing are parsed
+        with os.scandir(self.hub_path) as it:
+            for dir_entry in it:
+                if not dir_entry.name.endswith(".yml") or not dir_entry.is_file():
+                    continue
+                stat = dir_entry.stat()
+                meta = index.get(dir_entry.name)
+                if meta is None or meta["mtime_ns"] != stat.st_mtime_ns or meta["size"] != stat.st_size:
+                    try:
+                        with open(dir_entry.path, "r", encoding="utf-8") as f:
+                            data = yaml.safe_load(f)
+                        name = data["app"]["name"]
+                    except Exception:
+                        continue
+                    meta = {"name": name, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+                fresh[dir_entry.name] = meta
                 workflows.append({
-                    "filename": filepath.name,
-                    "name": workflow.name,
-                    "path": str(filepath)
+                    "filename": dir_entry.name,
+                    "name": meta["name"],
+                    "path": str(self.hub_path / dir_entry.name)
                 })
-            except Exception:
-                continue
 
+        if fresh != index:
+            self._save_index(fresh)
         return workflows
 
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Read the filename -> metadata sidecar, empty if missing or corrupt"""
+        try:
+            return json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index: Dict[str, Dict[str, Any]]):
+        """Write the sidecar atomically so concurrent readers never see half of it"""
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(index), encoding="utf-8")
+        os.replace(tmp_path, self.index_path)
+
     def install_workflow(self, filename: str, target_dir: str = "./workflows"):
         """Install workflow from hub"""
         source = self.hub_path / filename
@@ -2,24 +2,169 @@
 Migration tools for workflows
 Migrate between Dify versions and other platforms
 """
+import copy
+import hashlib
 import json
 import re
-from typing import Dict, List, Optional, Any, Callable
+from collections import OrderedDict
+from functools import cached_property
+from typing import Dict, Iterator, List, Optional, Any, Callable, Tuple
 from pathlib import Path
 
+import yaml
+
+# libyaml's C loader is several times faster when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Longest string probed as a file path before it is treated as a document
+_MAX_PATH_LENGTH = 4096
+
+# Migrated nodes are laid out left to right on a single row
+_ROW_Y = 300
+_COLUMN_WIDTH = 300
+
+# prompt="..." or prompt='...' up to the matching, unescaped quote
+_PROMPT_RE = re.compile(r'''prompt\s*=\s*(?:"((?:[^"\\]|\\.)*)"|'((?:[^'\\]|\\.)*)')''', re.DOTALL)
+
+
+def _parse_langchain(code: str) -> Dict[str, Any]:
+    """
+    Scan Langchain source for an LLM chain and its first prompt literal.
+
+    Returns {"is_chain": bool, "prompt": str or None}; the prompt is only
+    searched for when the source looks like a chain.
+    """
+    if "LLMChain" not in code and "|" not in code:
+        return {"is_chain": False, "prompt": None}
+
+    match = _PROMPT_RE.search(code)
+    if not match:
+        return {"is_chain": True, "prompt": None}
+    double, single = match.groups()
+    return {"is_chain": True, "prompt": double if double is not None else single}
+
+
+# Keyword -> Dify node type, checked in order against the lowercased
+# source type; the first keyword found wins
+_MAKE_TYPE_MAP = (("http", "http"), ("openai", "llm"), ("filter", "if-else"))
+_ZAPIER_TYPE_MAP = (
+    ("delay", "code"),  # No delay node, use code
+    ("filter", "if-else"),
+    ("path", "if-else"),
+)
+
+
+# Compact Make scenario: (name, ((dify_type, title, desc), ...))
+CompactScenario = Tuple[str, Tuple[Tuple[str, str, str], ...]]
+
+
+def _classify(source_type: str, type_map: Tuple[Tuple[str, str], ...], default: str) -> str:
+    """Map a Make/Zapier module type to a Dify node type"""
+    source_type = source_type.lower()
+    return next((dify_type for keyword, dify_type in type_map if keyword in source_type), default)
+
+
+def _is_source_file(source: Any) -> bool:
+    """Whether source names an existing file rather than holding a document"""
+    if isinstance(source, Path):
+        return source.exists()
+    # Multi-line or very long strings are documents; don't stat them
+    if not isinstance(source, str) or "\n" in source or len(source) > _MAX_PATH_LENGTH:
+        return False
+    try:
+        return Path(source).exists()
+    except (OSError, ValueError):
+        # e.g. a single-line JSON document longer than NAME_MAX
+        return False
+
+
+def _load_json_file(path: Any) -> Any:
+    """Read a JSON workflow file, with orjson when installed"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson is strict (no NaN/Infinity); let json decide
+            pass
+    return json.loads(raw)
+
+
+def _row_positions(start_x: int, count: int) -> List[Dict[str, int]]:
+    """Positions for count nodes placed left to right from start_x"""
+    stop = start_x + count * _COLUMN_WIDTH
+    return [{"x": x, "y": _ROW_Y} for x in range(start_x, stop, _COLUMN_WIDTH)]
+
+
+class MigrationCache:
+    """
+    LRU cache of migrated workflows keyed by source content and target version.
+
+    Results are deep-copied on store and on every hit, so callers always
+    get an independent copy with the loader's own types (dates, int keys).
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[bytes, str], Dict[str, Any]]" = OrderedDict()
+
+    @staticmethod
+    def key(source: str, target_version: str) -> Tuple[bytes, str]:
+        """Cache key for a source document and target version"""
+        return hashlib.blake2b(source.encode("utf-8"), digest_size=16).digest(), target_version
+
+    def get(self, key: Tuple[bytes, str]) -> Optional[Dict[str, Any]]:
+        """Get a copy of a cached result, or None"""
+        stored = self._entries.get(key)
+        if stored is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return copy.deepcopy(stored)
+
+    def put(self, key: Tuple[bytes, str], result: Dict[str, Any]):
+        """Store a migration result"""
+        self._entries[key] = copy.deepcopy(result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached results and reset counters"""
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        """Hit/miss counters and current size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
 
 class DifyVersionMigrator:
     """Migrate workflows between Dify DSL versions"""
 
     VERSIONS = ["0.1.0", "0.2.0", "0.3.0", "0.4.0", "0.5.0"]
+    _VERSION_IDX = {v: i for i, v in enumerate(VERSIONS)}
 
-    def __init__(self):
-        self.migrations: Dict[str, Callable] = {
-            "0.1.0_0.2.0": self._migrate_010_to_020,
-            "0.2.0_0.3.0": self._migrate_020_to_030,
-            "0.3.0_0.4.0": self._migrate_030_to_040,
-            "0.4.0_0.5.0": self._migrate_040_to_050,
-        }
+    def __init__(self, cache: Optional[MigrationCache] = None):
+        self.cache = cache if cache is not None else MigrationCache()
 
     def migrate(self, workflow_data: Dict[str, Any], target_version: str = "0.5.0") -> Dict[str, Any]:
         """Migrate workflow to target version"""
@@ -29,56 +174,82 @@ class DifyVersionMigrator:
             return workflow_data
 
         # Find migration path
-        current_idx = self.VERSIONS.index(current_version)
-        target_idx = self.VERSIONS.index(target_version)
+        current_idx = self._VERSION_IDX.get(current_version)
+        if current_idx is None:
+            raise ValueError(f"Unknown source version: {current_version}")
+        target_idx = self._VERSION_IDX.get(target_version)
+        if target_idx is None:
+            raise ValueError(f"Unknown target version: {target_version}")
 
         if target_idx < current_idx:
             raise ValueError("Downgrading not supported")
 
-        result = workflow_data.copy()
+        result = workflow_data
 
-        for i in range(current_idx, target_idx):
-            from_ver = self.VERSIONS[i]
-            to_ver = self.VERSIONS[i + 1]
-            key = f"{from_ver}_{to_ver}"
+        for from_ver, to_ver, step in self._STEPS[current_idx:target_idx]:
+            print(f"Migrating {from_ver} -> {to_ver}")
+            result = {**step(self, result), "version": to_ver}
 
-            if key in self.migrations:
-                print(f"Migrating {from_ver} -> {to_ver}")
-                result = self.migrations[key](result)
-                result["version"] = to_ver
+        return result
 
+    def migrate_source(self, source: str, target_version: str = "0.5.0") -> Dict[str, Any]:
+        """
+        Parse and migrate a Dify DSL document (YAML or JSON text).
+
+        Results are cached by content, so migrating the same document again
+        skips both YAML parsing and the migration chain.
+        """
+        key = self.cache.key(source, target_version)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.migrate(yaml.load(source, Loader=_YamlLoader), target_version)
+            self.cache.put(key, result)
         return result
 
+    def cache_info(self) -> Dict[str, int]:
+        """Hit/miss statistics of the source cache"""
+        return self.cache.info()
+
+    # Migration steps never mutate their input: each returns a new dict that
+    # shares every subtree it does not change
+
     def _migrate_010_to_020(self, data: Dict) -> Dict:
         """Migrate 0.1.0 to 0.2.0"""
         # Add kind field
-        data["kind"] = "app"
-        return data
+        return {**data, "kind": "app"}
 
     def _migrate_020_to_030(self, data: Dict) -> Dict:
         """Migrate 0.2.0 to 0.3.0"""
         # Restructure app section
-        if "app" not in data:
-            data["app"] = {}
-        data["app"]["use_icon_as_answer_icon"] = False
-        return data
+        return {**data, "app": {**data.get("app", {}), "use_icon_as_answer_icon": False}}
 
     def _migrate_030_to_040(self, data: Dict) -> Dict:
         """Migrate 0.3.0 to 0.4.0"""
         # Add metadata
-        if "app" in data:
-            data["app"]["tags"] = []
-        return data
+        if "app" not in data:
+            return data
+        return {**data, "app": {**data["app"], "tags": []}}
 
     def _migrate_040_to_050(self, data: Dict) -> Dict:
         """Migrate 0.4.0 to 0.5.0"""
         # Update node structure
-        if "workflow" in data and "graph" in data["workflow"]:
-            for node in data["workflow"]["graph"].get("nodes", []):
-                # Add default values
-                if "data" in node:
-                    node["data"]["selected"] = False
-        return data
+        workflow = data.get("workflow")
+        if not workflow or "graph" not in workflow:
+            return data
+        graph = workflow["graph"]
+        # Add default values; edges and node-less entries are shared as-is
+        nodes = [
+            {**node, "data": {**node["data"], "selected": False}} if "data" in node else node
+            for node in graph.get("nodes", [])
+        ]
+        return {**data, "workflow": {**workflow, "graph": {**graph, "nodes": nodes}}}
+
+    # (from, to, step function) for each step VERSIONS[i] -> VERSIONS[i + 1]
+    _STEPS = tuple(zip(
+        VERSIONS,
+        VERSIONS[1:],
+        (_migrate_010_to_020, _migrate_020_to_030, _migrate_030_to_040, _migrate_040_to_050),
+    ))
 
 
 class LangchainMigrator:
@@ -86,33 +257,17 @@ class LangchainMigrator:
 
     def migrate(self, langchain_code: str) -> Dict[str, Any]:
         """Convert Langchain code to Dify workflow"""
-        workflow = {
-            "version": "0.5.0",
-            "kind": "app",
-            "app": {
-                "name": "Migrated from Langchain",
-                "mode": "workflow",
-                "description": "Auto-migrated from Langchain"
-            },
-            "workflow": {
-                "graph": {
-                    "nodes": [],
-                    "edges": []
-                }
-            }
-        }
+        nodes = []
+        edges = []
 
         # Parse LLM chain
-        if "LLMChain" in langchain_code or "|" in langchain_code:
+        parsed = _parse_langchain(langchain_code)
+        if parsed["is_chain"]:
             # Simple parsing - extract prompt template
-            prompt_match = re.search(r'prompt\s*=\s*[\'"](.+?)[\'"]', langchain_code, re.DOTALL)
-            if prompt_match:
-                prompt = prompt_match.group(1)
-            else:
-                prompt = "{{#start.input#}}"
+            prompt = parsed["prompt"] or "{{#start.input#}}"
 
             # Create workflow structure
-            workflow["workflow"]["graph"]["nodes"] = [
+            nodes = [
                 {
                     "id": "start",
                     "position": {"x": 100, "y": 300},
@@ -143,12 +298,26 @@ class LangchainMigrator:
                 }
             ]
 
-            workflow["workflow"]["graph"]["edges"] = [
+            edges = [
                 {"source": "start", "target": "llm"},
                 {"source": "llm", "target": "end"}
             ]
 
-        return workflow
+        return {
+            "version": "0.5.0",
+            "kind": "app",
+            "app": {
+                "name": "Migrated from Langchain",
+                "mode": "workflow",
+                "description": "Auto-migrated from Langchain"
+            },
+            "workflow": {
+                "graph": {
+                    "nodes": nodes,
+                    "edges": edges
+                }
+            }
+        }
 
 
 class MakeMigrator:
@@ -156,63 +325,78 @@ class MakeMigrator:
 
     def migrate(self, make_scenario: Dict) -> Dict[str, Any]:
         """Convert Make scenario to Dify workflow"""
+        return self.expand(self.migrate_compact(make_scenario))
+
+    def migrate_compact(self, make_scenario: Dict) -> CompactScenario:
+        """
+        Convert Make scenario to its compact form (see expand).
+
+        Only the per-module values are kept:
+        (name, ((dify_type, title, desc), ...)). Bulk pipelines can hold
+        these tuples and expand them when writing.
+        """
+        return (
+            make_scenario.get("name", "Migrated from Make"),
+            tuple(
+                (
+                    _classify(module.get("type", ""), _MAKE_TYPE_MAP, "code"),
+                    module.get("name", f"Node {i}"),
+                    module.get("description", ""),
+                )
+                for i, module in enumerate(make_scenario.get("modules", []))
+            ),
+        )
+
+    def expand(self, compact: CompactScenario) -> Dict[str, Any]:
+        """Build the full Dify workflow from migrate_compact output"""
+        name, steps = compact
+        nodes = []
+        edges = []
         workflow = {
             "version": "0.5.0",
             "kind": "app",
             "app": {
-                "name": make_scenario.get("name", "Migrated from Make"),
+                "name": name,
                 "mode": "workflow",
                 "description": "Auto-migrated from Make"
             },
             "workflow": {
                 "graph": {
-                    "nodes": [],
-                    "edges": []
+                    "nodes": nodes,
+                    "edges": edges
                 }
             }
         }
 
-        nodes = []
-        edges = []
+        for node, edge in self._iter_nodes(steps):
+            nodes.append(node)
+            if edge:
+                edges.append(edge)
 
-        # Map Make modules to Dify nodes
-        for i, module in enumerate(make_scenario.get("modules", [])):
-            node_id = f"node_{i}"
+        return workflow
 
-            # Determine node type
-            module_type = module.get("type", "")
-            if "http" in module_type.lower():
-                dify_type = "http"
-            elif "openai" in module_type.lower():
-                dify_type = "llm"
-            elif "filter" in module_type.lower():
-                dify_type = "if-else"
-            else:
-                dify_type = "code"
+    def _iter_nodes(self, steps: Tuple[Tuple[str, str, str], ...]) -> Iterator[Tuple[Dict, Optional[Dict]]]:
+        """Yield (node, edge from the previous node or None) per compact step"""
+        positions = _row_positions(100, len(steps))
+        prev_id = None
+
+        for i, (dify_type, title, desc) in enumerate(steps):
+            node_id = f"node_{i}"
 
             node = {
                 "id": node_id,
-                "position": {"x": 100 + i * 300, "y": 300},
+                "position": positions[i],
                 "data": {
                     "type": dify_type,
-                    "title": module.get("name", f"Node {i}"),
-                    "desc": module.get("description", "")
+                    "title": title,
+                    "desc": desc
                 }
             }
 
-            nodes.append(node)
-
-            # Create edge from previous node
-            if i > 0:
-                edges.append({
-                    "source": f"node_{i-1}",
-                    "target": node_id
-                })
-
-        workflow["workflow"]["graph"]["nodes"] = nodes
-        workflow["workflow"]["graph"]["edges"] = edges
-
-        return workflow
+            # Chain each node to the previous one
+            edge = {"source": prev_id, "target": node_id} if prev_id else None
+            yield node, edge
+            prev_id = node_id
 
 
 class ZapierMigrator:
@@ -220,6 +404,8 @@ class ZapierMigrator:
 
     def migrate(self, zap: Dict) -> Dict[str, Any]:
         """Convert Zap to Dify workflow"""
+        nodes = []
+        edges = []
         workflow = {
             "version": "0.5.0",
             "kind": "app",
@@ -230,84 +416,83 @@ class ZapierMigrator:
             },
             "workflow": {
                 "graph": {
-                    "nodes": [],
-                    "edges": []
+                    "nodes": nodes,
+                    "edges": edges
                 }
             }
         }
 
-        nodes = []
-        edges = []
+        for node, edge in self._iter_nodes(zap):
+            nodes.append(node)
+            if edge:
+                edges.append(edge)
+
+        return workflow
+
+    def _iter_nodes(self, zap: Dict) -> Iterator[Tuple[Dict, Optional[Dict]]]:
+        """Yield (node, edge from the previous node or None) for trigger, actions and end"""
+        actions = zap.get("actions", [])
+        # One slot per action plus the end node
+        positions = _row_positions(400, len(actions) + 1)
 
         # Trigger
         trigger = zap.get("trigger", {})
-        nodes.append({
+        yield {
             "id": "trigger",
-            "position": {"x": 100, "y": 300},
+            "position": {"x": 100, "y": _ROW_Y},
             "data": {
                 "type": "start",
                 "title": trigger.get("type", "Trigger"),
                 "variables": [{"variable": "trigger_data", "type": "object"}]
             }
-        })
+        }, None
+        prev_id = "trigger"
 
         # Actions
-        for i, action in enumerate(zap.get("actions", [])):
+        for i, action in enumerate(actions):
             node_id = f"action_{i}"
 
-            action_type = action.get("type", "")
-            if "delay" in action_type.lower():
-                dify_type = "code"  # No delay node, use code
-            elif "filter" in action_type.lower():
-                dify_type = "if-else"
-            elif "path" in action_type.lower():
-                dify_type = "if-else"
-            else:
-                dify_type = "http"
+            dify_type = _classify(action.get("type", ""), _ZAPIER_TYPE_MAP, "http")
 
-            nodes.append({
+            yield {
                 "id": node_id,
-                "position": {"x": 400 + i * 300, "y": 300},
+                "position": positions[i],
                 "data": {
                     "type": dify_type,
                     "title": action.get("type", f"Action {i}")
                 }
-            })
-
-            # Edge
-            prev_id = "trigger" if i == 0 else f"action_{i-1}"
-            edges.append({
-                "source": prev_id,
-                "target": node_id
-            })
+            }, {"source": prev_id, "target": node_id}
+            prev_id = node_id
 
         # Add end node
-        nodes.append({
+        yield {
             "id": "end",
-            "position": {"x": 400 + len(zap.get("actions", [])) * 300, "y": 300},
+            "position": positions[-1],
             "data": {"type": "end", "title": "End"}
-        })
+        }, {"source": prev_id, "target": "end"}
 
-        if nodes:
-            edges.append({
-                "source": f"action_{len(zap.get('actions', [])) - 1}" if zap.get("actions") else "trigger",
-                "target": "end"
-            })
 
-        workflow["workflow"]["graph"]["nodes"] = nodes
-        workflow["workflow"]["graph"]["edges"] = edges
+class WorkflowMigrator:
+    """Main migrator class - routes to specific migrators"""
 
-        return workflow
+    # Sub-migrators are created on first use, so routing a single format
+    # only builds the migrator it needs
 
+    @cached_property
+    def dify_migrator(self) -> DifyVersionMigrator:
+        return DifyVersionMigrator()
 
-class WorkflowMigrator:
-    """Main migrator class - routes to specific migrators"""
+    @cached_property
+    def langchain_migrator(self) -> LangchainMigrator:
+        return LangchainMigrator()
+
+    @cached_property
+    def make_migrator(self) -> MakeMigrator:
+        return MakeMigrator()
 
-    def __init__(self):
-        self.dify_migrator = DifyVersionMigrator()
-        self.langchain_migrator = LangchainMigrator()
-        self.make_migrator = MakeMigrator()
-        self.zapier_migrator = ZapierMigrator()
+    @cached_property
+    def zapier_migrator(self) -> ZapierMigrator:
+        return ZapierMigrator()
 
     def migrate(
         self,
@@ -329,19 +514,20 @@ class WorkflowMigrator:
             Migrated workflow as dict
         """
         # Load source if file path
-        if isinstance(source, (str, Path)) and Path(source).exists():
-            with open(source) as f:
-                if str(source).endswith('.json'):
-                    source = json.load(f)
-                else:
+        if _is_source_file(source):
+            if str(source).endswith('.json'):
+                source = _load_json_file(source)
+            else:
+                with open(source) as f:
                     source = f.read()
 
         # Convert to Dify format
         if from_format == "dify":
+            target_version = options.get("target_version", "0.5.0")
             if isinstance(source, str):
-                import yaml
-                source = yaml.safe_load(source)
-            result = self.dify_migrator.migrate(source, options.get("target_version", "0.5.0"))
+                result = self.dify_migrator.migrate_source(source, target_version)
+            else:
+                result = self.dify_migrator.migrate(source, target_version)
 
         elif from_format == "langchain":
             result = self.langchain_migrator.migrate(source)
@@ -356,3 +542,20 @@ class WorkflowMigrator:
             raise ValueError(f"Unsupported source format: {from_format}")
 
         return result
+
+
+# Global migrator instance
+_global_migrator: Optional[WorkflowMigrator] = None
+
+
+def get_migrator() -> WorkflowMigrator:
+    """Get the shared WorkflowMigrator (and its source cache)"""
+    global _global_migrator
+    if _global_migrator is None:
+        _global_migrator = WorkflowMigrator()
+    return _global_migrator
+
+
+def migrate_workflow(source: Any, from_format: str, to_format: str = "dify", **options) -> Dict[str, Any]:
+    """Migrate a workflow with the shared migrator (see WorkflowMigrator.migrate)"""
+    return get_migrator().migrate(source, from_format, to_format, **options)
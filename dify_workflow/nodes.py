@@ -5,17 +5,61 @@ Each node class represents a Dify workflow node type and generates
 the correct data structure for the DSL format.
 """
 
-import uuid
+import json
+import os
+import random
+import sys
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Union
 from dataclasses import dataclass, field
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    _json_dumps_bytes = orjson.dumps
+else:
+    def _json_dumps_bytes(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+# Slotted dataclasses drop the per-instance __dict__, which shrinks nodes and
+# speeds up attribute access during serialization (Python 3.10+ only)
+_DATACLASS_OPTIONS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+# Node IDs only need to be unique within a workflow, not unpredictable, so
+# they come from a userspace PRNG seeded from os.urandom instead of a
+# syscall per ID. getrandbits is a single C call, safe across threads.
+_ID_RNG = random.Random()
+
+if hasattr(os, "register_at_fork"):
+    # A forked child must not replay its parent's sequence
+    os.register_at_fork(after_in_child=_ID_RNG.seed)
+
 
 def _generate_id() -> str:
     """Generate a short unique ID like Dify uses"""
-    return uuid.uuid4().hex[:8]
+    return f"{_ID_RNG.getrandbits(32):08x}"
 
 
-@dataclass
+def _generate_ids(count: int) -> List[str]:
+    """Generate count IDs at once"""
+    getrandbits = _ID_RNG.getrandbits
+    return [f"{getrandbits(32):08x}" for _ in range(count)]
+
+
+@lru_cache(maxsize=128)
+def _default_title(node_type: str) -> str:
+    """Title for untitled nodes, e.g. 'http-request' -> 'Http Request'"""
+    return node_type.replace("-", " ").title()
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Node:
     """Base class for all workflow nodes"""
     
@@ -40,18 +84,27 @@ class Node:
             "height": self.height,
             "data": {
                 "type": self._node_type,
-                "title": self.title or self._node_type.replace("-", " ").title(),
+                "title": self.title or _default_title(self._node_type),
                 "desc": self.desc,
                 **self._get_data(),
             },
         }
     
+    def to_json_bytes(self) -> bytes:
+        """Convert node to compact UTF-8 JSON (uses orjson when installed)"""
+        return _json_dumps_bytes(self.to_dict())
+    
     def _get_data(self) -> Dict[str, Any]:
         """Override in subclasses to provide node-specific data"""
         return {}
 
 
-@dataclass
+def serialize_nodes(nodes: List[Node]) -> List[Dict[str, Any]]:
+    """Convert a list of nodes to Dify DSL format, preserving order"""
+    return [node.to_dict() for node in nodes]
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class StartNode(Node):
     """
     Workflow entry point.
@@ -65,23 +118,23 @@ class StartNode(Node):
     variables: List[Dict[str, Any]] = field(default_factory=list)
     
     def _get_data(self) -> Dict[str, Any]:
-        return {
-            "variables": [
-                {
-                    "variable": v.get("name", v.get("variable", "")),
-                    "type": v.get("type", "string"),
-                    "label": v.get("label", v.get("name", v.get("variable", ""))),
-                    "required": v.get("required", False),
-                    "max_length": v.get("max_length", 256),
-                    "default": v.get("default", ""),
-                    "options": v.get("options", []),
-                }
-                for v in self.variables
-            ]
-        }
-
-
-@dataclass
+        variables = []
+        for v in self.variables:
+            # Resolved once; it is both the variable and the default label
+            name = v["name"] if "name" in v else v.get("variable", "")
+            variables.append({
+                "variable": name,
+                "type": v.get("type", "string"),
+                "label": v.get("label", name),
+                "required": v.get("required", False),
+                "max_length": v.get("max_length", 256),
+                "default": v.get("default", ""),
+                "options": v.get("options", []),
+            })
+        return {"variables": variables}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class EndNode(Node):
     """
     Workflow output node.
@@ -106,7 +159,7 @@ class EndNode(Node):
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class AnswerNode(Node):
     """
     Streaming answer node for chat apps.
@@ -124,7 +177,7 @@ class AnswerNode(Node):
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class LLMNode(Node):
     """
     Large Language Model node.
@@ -159,11 +212,17 @@ class LLMNode(Node):
         # Set title if not provided
         if not self.title:
             self.title = "LLM"
-        # Ensure model has completion_params with temperature
-        if "completion_params" not in self.model:
-            self.model["completion_params"] = {}
-        self.model["completion_params"]["temperature"] = self.temperature
-        self.model["completion_params"]["max_tokens"] = self.max_tokens
+        # Ensure model has completion_params with temperature. Both dicts are
+        # rebuilt in one pass rather than written in place: the caller's model
+        # (e.g. a shallow copy of DEFAULT_MODEL) may share them with other nodes
+        self.model = {
+            **self.model,
+            "completion_params": {
+                **self.model.get("completion_params", {}),
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
+            },
+        }
     
     def _get_data(self) -> Dict[str, Any]:
         data = {
@@ -186,7 +245,7 @@ class LLMNode(Node):
         return data
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class HTTPNode(Node):
     """
     HTTP Request node for API calls.
@@ -215,7 +274,7 @@ class HTTPNode(Node):
             self.title = "HTTP Request"
     
     def _get_data(self) -> Dict[str, Any]:
-        data = {
+        return {
             "url": self.url,
             "method": self.method,
             "headers": self.headers,
@@ -226,17 +285,13 @@ class HTTPNode(Node):
                 "read": self.timeout,
                 "write": self.timeout,
             },
+            # Defaults stay fresh literals: yaml.dump would write a dict shared
+            # between nodes as &id anchors and aliases
+            "authorization": self.authorization or {"type": "no-auth"},
         }
-        
-        if self.authorization:
-            data["authorization"] = self.authorization
-        else:
-            data["authorization"] = {"type": "no-auth"}
-            
-        return data
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class CodeNode(Node):
     """
     Code execution node.
@@ -287,7 +342,7 @@ class CodeNode(Node):
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class IfElseNode(Node):
     """
     Conditional branching node.
@@ -307,27 +362,28 @@ class IfElseNode(Node):
             self.title = "IF/ELSE"
     
     def _get_data(self) -> Dict[str, Any]:
+        group_id, *condition_ids = _generate_ids(len(self.conditions) + 1)
         return {
             "conditions": [
                 {
-                    "id": _generate_id(),
+                    "id": group_id,
                     "logical_operator": self.logical_operator,
                     "conditions": [
                         {
-                            "id": _generate_id(),
+                            "id": condition_id,
                             "varType": "string",
                             "variable_selector": c.get("variable_selector", []),
                             "comparison_operator": c.get("comparison_operator", "contains"),
                             "value": c.get("value", ""),
                         }
-                        for c in self.conditions
+                        for condition_id, c in zip(condition_ids, self.conditions)
                     ],
                 }
             ],
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class VariableAggregatorNode(Node):
     """
     Variable aggregator node to combine multiple variables.
@@ -353,7 +409,7 @@ class VariableAggregatorNode(Node):
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class TemplateNode(Node):
     """
     Jinja2 template transformation node.
@@ -378,7 +434,7 @@ class TemplateNode(Node):
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class IterationNode(Node):
     """
     Iteration node for looping over arrays.
@@ -408,7 +464,7 @@ class IterationNode(Node):
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class KnowledgeNode(Node):
     """
     Knowledge retrieval node.
@@ -445,7 +501,7 @@ class KnowledgeNode(Node):
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class QuestionClassifierNode(Node):
     """
     Question classifier node for intent routing.
@@ -476,7 +532,8 @@ class QuestionClassifierNode(Node):
             "query_variable_selector": self.query_variable_selector,
             "classes": [
                 {
-                    "id": c.get("id", _generate_id()),
+                    # Only classes without an id need a fresh one
+                    "id": c["id"] if "id" in c else _generate_id(),
                     "name": c.get("name", "Category"),
                 }
                 for c in self.classes
@@ -485,7 +542,7 @@ class QuestionClassifierNode(Node):
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ParameterExtractorNode(Node):
     """
     Parameter extractor node for structured data extraction.
@@ -529,7 +586,7 @@ class ParameterExtractorNode(Node):
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ToolNode(Node):
     """
     Tool node for calling external tools/plugins.
@@ -563,7 +620,7 @@ class ToolNode(Node):
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class AssignerNode(Node):
     """
     Variable assigner node.
@@ -592,7 +649,7 @@ class AssignerNode(Node):
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class DocumentExtractorNode(Node):
     """
     Document extractor node.
@@ -615,7 +672,7 @@ class DocumentExtractorNode(Node):
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ListFilterNode(Node):
     """
     List filter node.
@@ -643,12 +700,12 @@ class ListFilterNode(Node):
                 "logical_operator": "and",
                 "conditions": [
                      {
-                        "id": _generate_id(),
+                        "id": condition_id,
                         "key": c.get("key", ""),
                         "comparison_operator": c.get("operator", "contains"),
                         "value": c.get("value", ""),
                     }
-                    for c in self.conditions
+                    for condition_id, c in zip(_generate_ids(len(self.conditions)), self.conditions)
                 ]
             },
             "limit": self.limit,
@@ -3,7 +3,11 @@ AI-Powered Workflow Optimizer
 Analyzes workflows and suggests improvements for performance, cost, and quality
 """
 import json
-from typing import Dict, List, Optional, Any
+import re
+from collections import Counter
+from itertools import chain
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 
@@ -24,6 +28,37 @@ class Severity(Enum):
     INFO = "info"                    # Informational
 
 
+# Score gained by auto-applying a suggestion of each severity
+_SEVERITY_SCORE = {
+    Severity.CRITICAL: 10,
+    Severity.HIGH: 5,
+    Severity.MEDIUM: 3,
+    Severity.LOW: 1,
+}
+
+# Prompt fragments that interpolate user input without sanitization
+_DANGEROUS_PROMPT_PATTERNS = ["{{#", "{user_input}"]
+_DANGEROUS_PROMPT_RE = re.compile("|".join(map(re.escape, _DANGEROUS_PROMPT_PATTERNS)))
+
+
+def _model_name(data: Dict[str, Any]) -> Optional[str]:
+    """Model name of a node, or None if the model config is missing or malformed"""
+    model = data.get("model")
+    return model.get("name") if isinstance(model, dict) else None
+
+
+def _has_high_temperature(data: Dict[str, Any]) -> bool:
+    """Whether a node's temperature is above 0.5 (unset defaults to 0.7)"""
+    temperature = data.get("temperature", 0.7)
+    return isinstance(temperature, (int, float)) and temperature > 0.5
+
+
+def _prompt_text(data: Dict[str, Any]) -> str:
+    """Prompt of a node, or "" if it is missing or not a string"""
+    prompt = data.get("prompt")
+    return prompt if isinstance(prompt, str) else ""
+
+
 @dataclass
 class OptimizationSuggestion:
     """Single optimization suggestion"""
@@ -51,6 +86,15 @@ class OptimizationReport:
     summary: Dict[str, int]
 
 
+@dataclass
+class _CompiledRule:
+    """Optimization rule with its check signature resolved"""
+    order: int
+    rule: Dict[str, Any]
+    check: Callable[..., bool]
+    needs_workflow: bool
+
+
 class WorkflowOptimizer:
     """
     AI-Powered Workflow Optimizer
@@ -70,7 +114,7 @@ class WorkflowOptimizer:
                 "title": "Consider using cheaper model",
                 "description": "For simple tasks, GPT-3.5-Turbo can be 10x cheaper than GPT-4",
                 "applies_to": ["llm"],
-                "check": lambda node: node.data.get("model", {}).get("name") == "gpt-4",
+                "check": lambda node: _model_name(node.data) == "gpt-4",
                 "suggestion": "gpt-3.5-turbo"
             },
             {
@@ -80,7 +124,7 @@ class WorkflowOptimizer:
                 "title": "Temperature too high for deterministic tasks",
                 "description": "Use lower temperature (0.0-0.3) for tasks requiring consistency",
                 "applies_to": ["llm"],
-                "check": lambda node: node.data.get("temperature", 0.7) > 0.5,
+                "check": lambda node: _has_high_temperature(node.data),
                 "suggestion": 0.2
             },
             {
@@ -110,7 +154,7 @@ class WorkflowOptimizer:
                 "title": "Prompt may be too long",
                 "description": "Long prompts increase token costs. Consider chunking or summarization",
                 "applies_to": ["llm"],
-                "check": lambda node: len(node.data.get("prompt", "")) > 2000,
+                "check": lambda node: len(_prompt_text(node.data)) > 2000,
                 "suggestion": "Use variable aggregation or document extraction"
             },
             {
@@ -149,49 +193,47 @@ class WorkflowOptimizer:
         """
         Analyze a workflow and generate optimization report
         """
-        suggestions = []
-
-        # Run all optimization rules
-        for rule in self.rules:
-            for node in workflow.nodes:
-                if rule["applies_to"] == ["all"] or node.type in rule["applies_to"]:
-                    try:
-                        # Check if rule applies
-                        if "workflow" in rule["check"].__code__.co_varnames:
-                            applies = rule["check"](node, workflow)
-                        else:
-                            applies = rule["check"](node)
-
-                        if applies:
-                            suggestion = OptimizationSuggestion(
-                                id=rule["id"],
-                                type=rule["type"],
-                                severity=rule["severity"],
-                                title=rule["title"],
-                                description=rule["description"],
-                                node_id=node.id,
-                                node_type=node.type,
-                                current_value=self._get_current_value(node, rule),
-                                suggested_value=rule.get("suggestion"),
-                                expected_improvement=self._calculate_improvement(rule, node),
-                                auto_applicable=self._is_auto_applicable(rule)
-                            )
-                            suggestions.append(suggestion)
-                    except Exception:
-                        continue
+        rules_by_type = self._compile_rules()
+        catch_all = rules_by_type.get("all", [])
+        hits = []
+
+        # Run the rules that apply to each node's type
+        for node in workflow.nodes:
+            for compiled in chain(rules_by_type.get(node.type, ()), catch_all):
+                rule = compiled.rule
+                # Check if rule applies
+                if compiled.needs_workflow:
+                    applies = compiled.check(node, workflow)
+                else:
+                    applies = compiled.check(node)
+
+                if applies:
+                    suggestion = OptimizationSuggestion(
+                        id=rule["id"],
+                        type=rule["type"],
+                        severity=rule["severity"],
+                        title=rule["title"],
+                        description=rule["description"],
+                        node_id=node.id,
+                        node_type=node.type,
+                        current_value=self._get_current_value(node, rule),
+                        suggested_value=rule.get("suggestion"),
+                        expected_improvement=self._calculate_improvement(rule, node),
+                        auto_applicable=self._is_auto_applicable(rule)
+                    )
+                    hits.append((compiled.order, suggestion))
+
+        # Report suggestions grouped by rule, in node order within a rule
+        hits.sort(key=itemgetter(0))
+        suggestions = [suggestion for _, suggestion in hits]
 
         # Calculate scores
         original_score = self._calculate_score(workflow)
-        optimized_score = self._calculate_optimized_score(workflow, suggestions)
+        optimized_score = self._calculate_optimized_score(original_score, suggestions)
 
         # Group by type
-        summary = {
-            "critical": len([s for s in suggestions if s.severity == Severity.CRITICAL]),
-            "high": len([s for s in suggestions if s.severity == Severity.HIGH]),
-            "medium": len([s for s in suggestions if s.severity == Severity.MEDIUM]),
-            "low": len([s for s in suggestions if s.severity == Severity.LOW]),
-            "info": len([s for s in suggestions if s.severity == Severity.INFO]),
-        }
+        counts = Counter(s.severity for s in suggestions)
+        summary = {severity.value: counts[severity] for severity in Severity}
 
         return OptimizationReport(
             workflow_name=workflow.name,
@@ -201,6 +243,28 @@ class WorkflowOptimizer:
             summary=summary
         )
 
+    def _compile_rules(self) -> Dict[str, List["_CompiledRule"]]:
+        """
+        Bucket rules by node type, resolving each check's signature once.
+
+        Done per analyze() call (O(rules), not O(rules x nodes)) so rules
+        added to self.rules after construction are still picked up.
+        """
+        rules_by_type: Dict[str, List[_CompiledRule]] = {}
+        for order, rule in enumerate(self.rules):
+            check = rule["check"]
+            compiled = _CompiledRule(
+                order=order,
+                rule=rule,
+                check=check,
+                needs_workflow="workflow" in check.__code__.co_varnames,
+            )
+            applies_to = rule["applies_to"]
+            node_types = ["all"] if applies_to == ["all"] else dict.fromkeys(applies_to)
+            for node_type in node_types:
+                rules_by_type.setdefault(node_type, []).append(compiled)
+        return rules_by_type
+
     def optimize(self, workflow, auto_apply: bool = False) -> tuple:
         """
         Optimize a workflow by applying suggestions
@@ -210,32 +274,33 @@ class WorkflowOptimizer:
         optimized = workflow.clone()
 
         if auto_apply:
+            # Index once so applying S suggestions is O(S), not O(S x N)
+            nodes_by_id = {}
+            for node in optimized.nodes:
+                nodes_by_id.setdefault(node.id, node)
+
             for suggestion in report.suggestions:
-                if suggestion.auto_applicable:
-                    self._apply_suggestion(optimized, suggestion)
+                if suggestion.auto_applicable and suggestion.node_id:
+                    node = nodes_by_id.get(suggestion.node_id)
+                    if node is not None:
+                        self._apply_suggestion(node, suggestion)
 
         return optimized, report
 
-    def _apply_suggestion(self, workflow, suggestion: OptimizationSuggestion):
-        """Apply a single optimization suggestion"""
-        if not suggestion.node_id:
-            return
-
-        for node in workflow.nodes:
-            if node.id == suggestion.node_id:
-                if suggestion.id == "llm-model-downgrade":
-                    node.data["model"]["name"] = "gpt-3.5-turbo"
-                elif suggestion.id == "high-temperature":
-                    node.data["temperature"] = 0.2
-                elif suggestion.id == "caching":
-                    node.data["cache_enabled"] = True
-                    node.data["cache_ttl"] = 3600
-                break
+    def _apply_suggestion(self, node, suggestion: OptimizationSuggestion):
+        """Apply a single optimization suggestion to its node"""
+        if suggestion.id == "llm-model-downgrade":
+            node.data["model"]["name"] = "gpt-3.5-turbo"
+        elif suggestion.id == "high-temperature":
+            node.data["temperature"] = 0.2
+        elif suggestion.id == "caching":
+            node.data["cache_enabled"] = True
+            node.data["cache_ttl"] = 3600
 
     def _get_current_value(self, node, rule: Dict) -> Any:
         """Get current value for a rule"""
         if "llm-model" in rule["id"]:
-            return node.data.get("model", {}).get("name")
+            return _model_name(node.data)
         elif "temperature" in rule["id"]:
             return node.data.get("temperature")
         return None
@@ -263,29 +328,20 @@ class WorkflowOptimizer:
         # Deduct points for issues
         for node in workflow.nodes:
             if node.type == "llm":
-                if node.data.get("temperature", 0.7) > 0.5:
+                if _has_high_temperature(node.data):
                     score -= 5
-                if node.data.get("model", {}).get("name") == "gpt-4":
+                if _model_name(node.data) == "gpt-4":
                     score -= 2  # Not bad, but expensive
             if node.type == "http" and not node.data.get("retry"):
                 score -= 10
 
         return max(0, score)
 
-    def _calculate_optimized_score(self, workflow, suggestions: List[OptimizationSuggestion]) -> int:
+    def _calculate_optimized_score(self, base_score: int, suggestions: List[OptimizationSuggestion]) -> int:
         """Calculate potential score after optimizations"""
-        base_score = self._calculate_score(workflow)
-
         for suggestion in suggestions:
             if suggestion.auto_applicable:
-                if suggestion.severity == Severity.CRITICAL:
-                    base_score += 10
-                elif suggestion.severity == Severity.HIGH:
-                    base_score += 5
-                elif suggestion.severity == Severity.MEDIUM:
-                    base_score += 3
-                elif suggestion.severity == Severity.LOW:
-                    base_score += 1
+                base_score += _SEVERITY_SCORE.get(suggestion.severity, 0)
 
         return min(100, base_score)
 
@@ -301,10 +357,8 @@ class WorkflowOptimizer:
 
     def _check_prompt_injection_risk(self, node) -> bool:
         """Check for potential prompt injection"""
-        prompt = node.data.get("prompt", "")
         # Check for direct variable interpolation without sanitization
-        dangerous_patterns = ["{{#", "{user_input}"]
-        return any(pattern in prompt for pattern in dangerous_patterns)
+        return _DANGEROUS_PROMPT_RE.search(_prompt_text(node.data)) is not None
 
 
 class AIOptimizer:
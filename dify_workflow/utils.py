@@ -5,7 +5,7 @@ Utility functions for Dify Workflow Generator.
 import re
 from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
-from .nodes import Node
+from .nodes import Node, _generate_id
 
 
 def generate_slug(text: str) -> str:
@@ -182,11 +182,10 @@ def clone_node(node: Node, new_title: Optional[str] = None) -> Node:
         New cloned node
     """
     import copy
-    import uuid
     
     # Deep copy the node
     new_node = copy.copy(node)
-    new_node.id = uuid.uuid4().hex[:8]
+    new_node.id = _generate_id()
     
     if new_title:
         new_node.title = new_title
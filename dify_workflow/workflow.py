@@ -5,10 +5,11 @@ This generates YAML files that can be directly imported into Dify.
 """
 
 import json
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple, Union
 import yaml
 
-from .nodes import Node, StartNode, EndNode
+from .nodes import Node, StartNode, EndNode, serialize_nodes, _DATACLASS_OPTIONS
 from .constants import DSL_VERSION
 from .exceptions import ValidationError, ConnectionError
 from .logging_config import get_logger
@@ -16,6 +17,15 @@ from .logging_config import get_logger
 logger = get_logger("workflow")
 
 
+@dataclass(**_DATACLASS_OPTIONS)
+class _LoadedNode(Node):
+    """Node restored from DSL; its node-specific data is kept verbatim"""
+    data: Dict[str, Any] = field(default_factory=dict)
+    
+    def _get_data(self) -> Dict[str, Any]:
+        return self.data
+
+
 class Workflow:
     """
     Build Dify workflows programmatically.
@@ -216,7 +226,7 @@ class Workflow:
             },
             "workflow": {
                 "graph": {
-                    "nodes": [n.to_dict() for n in self.nodes],
+                    "nodes": serialize_nodes(self.nodes),
                     "edges": self.edges,
                 },
                 "features": self.features,
@@ -225,6 +235,51 @@ class Workflow:
             },
         }
     
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Workflow":
+        """
+        Rebuild a workflow from its Dify DSL dictionary (see to_dict).
+        
+        Nodes keep their ids, positions and data sections, so
+        from_dict(d).to_dict() reproduces d. Nested values are shared with
+        the input, not copied.
+        """
+        app = data.get("app", {})
+        wf_data = data.get("workflow", {})
+        graph = wf_data.get("graph", {})
+        
+        wf = cls(
+            name=app.get("name", "Workflow"),
+            mode=app.get("mode", "workflow"),
+            description=app.get("description", ""),
+            icon=app.get("icon", "🤖"),
+            icon_background=app.get("icon_background", "#FFEAD5"),
+        )
+        
+        for node in graph.get("nodes", []):
+            node_data = dict(node.get("data", {}))
+            node_type = node_data.pop("type", "base")
+            position = node.get("position", {})
+            wf.nodes.append(_LoadedNode(
+                id=node["id"],
+                title=node_data.pop("title", ""),
+                desc=node_data.pop("desc", ""),
+                width=node.get("width", 244),
+                height=node.get("height", 54),
+                position_x=position.get("x", 0),
+                position_y=position.get("y", 0),
+                _node_type=node_type,
+                data=node_data,
+            ))
+        
+        wf.edges = list(graph.get("edges", []))
+        wf.features = wf_data.get("features", {})
+        wf.environment_variables = list(wf_data.get("environment_variables", []))
+        wf.conversation_variables = list(wf_data.get("conversation_variables", []))
+        wf._node_counter = len(wf.nodes)
+        wf._edge_counter = len(wf.edges)
+        return wf
+    
     def to_yaml(self) -> str:
         """Export as YAML string (Dify's native format)."""
         return yaml.dump(
@@ -345,7 +400,7 @@ class Workflow:
         issues = []
         
         # Check for start node
-        start_nodes = [n for n in self.nodes if isinstance(n, StartNode)]
+        start_nodes = [n for n in self.nodes if n._node_type == "start"]
         if len(start_nodes) == 0:
             issues.append("Warning: No start node found")
         elif len(start_nodes) > 1:
@@ -353,7 +408,7 @@ class Workflow:
         
         # Check for end node (for workflow mode)
         if self.mode == "workflow":
-            end_nodes = [n for n in self.nodes if isinstance(n, EndNode)]
+            end_nodes = [n for n in self.nodes if n._node_type == "end"]
             if len(end_nodes) == 0:
                 issues.append("Warning: No end node found (required for workflow mode)")
         
@@ -367,7 +422,7 @@ class Workflow:
         node_titles = {n.title: n.id for n in self.nodes}
         
         for node in self.nodes:
-            if node.id not in connected_ids and not isinstance(node, StartNode):
+            if node.id not in connected_ids and node._node_type != "start":
                 issues.append(f"Warning: Node '{node.title}' ({node.id}) is not connected")
                 
             # Validate variable references in node data
@@ -28,6 +28,17 @@ class TestWorkflowBuilder:
         
         assert len(wf.nodes) == 4
     
+    def test_llm_temperatures_are_independent(self):
+        wf = (WorkflowBuilder("Temps")
+              .start_with([{"name": "q", "type": "string"}])
+              .llm("A", temperature=0.1)
+              .llm("B", temperature=0.9)
+              .build())
+        
+        temps = [n.model["completion_params"]["temperature"]
+                 for n in wf.nodes if isinstance(n, LLMNode)]
+        assert temps == [0.1, 0.9]
+    
     def test_http_node(self):
         wf = (WorkflowBuilder("API Caller")
               .start_with([{"name": "url", "type": "string"}])
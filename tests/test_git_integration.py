@@ -0,0 +1,64 @@
+"""
+Tests for workflow version control
+"""
+
+import json
+import pytest
+from dify_workflow import Workflow, StartNode, EndNode
+from dify_workflow.git_integration import WorkflowGit
+
+
+@pytest.fixture
+def repo(tmp_path):
+    workflow_file = tmp_path / "workflow.yml"
+    workflow_file.write_text("app:\n  name: Test\n")
+    return WorkflowGit(str(workflow_file))
+
+
+class TestWorkflowGit:
+    def test_commit_and_log(self, repo):
+        first = repo.commit("initial")
+        repo.workflow_path.write_text("app:\n  name: Changed\n")
+        second = repo.commit("rename")
+
+        history = repo.log()
+        assert [c.hash for c in history] == [second, first]
+        assert isinstance(history[0].timestamp, float)
+
+    def test_list_branches_formats_timestamp(self, repo):
+        repo.create_branch("feature")
+        names = {b["name"]: b for b in repo.list_branches()}
+        assert set(names) == {"main", "feature"}
+        assert isinstance(names["feature"]["created_at"], str)
+
+    def test_loads_legacy_iso_timestamps(self, repo):
+        commit_hash = repo.commit("initial")
+        commit_file = repo.commits_dir / f"{commit_hash}.json"
+        data = json.loads(commit_file.read_text())
+        data["timestamp"] = "2024-01-01T12:00:00"
+        commit_file.write_text(json.dumps(data))
+
+        commit = repo.log()[0]
+        assert isinstance(commit.timestamp, float)
+
+    def test_diff_is_structural_for_workflow_files(self, tmp_path):
+        wf = Workflow("Diff")
+        start = StartNode(title="Start")
+        wf.add_node(start)
+        workflow_file = tmp_path / "wf.yml"
+        workflow_file.write_text(wf.to_yaml())
+        repo = WorkflowGit(str(workflow_file))
+        first = repo.commit("start only")
+
+        end = EndNode(title="End")
+        wf.add_node(end)
+        wf.connect(start, end)
+        workflow_file.write_text(wf.to_yaml())
+        second = repo.commit("add end")
+
+        result = repo.diff(second, first)
+        assert result["changes"]["added_nodes"] == [end.id]
+        assert len(result["changes"]["added_edges"]) == 1
+
+        textual = repo.diff(second, first, textual=True)
+        assert "diff" in textual
@@ -2,8 +2,12 @@
 Tests for Interactive Workflow Builder
 """
 
+import asyncio
 import pytest
-from dify_workflow.interactive import InteractiveBuilder, WorkflowIntent, visualize
+from types import SimpleNamespace
+from dify_workflow.interactive import (
+    AIWorkflowBuilder, IntentCache, InteractiveBuilder, WorkflowIntent, visualize,
+)
 
 
 class TestInteractiveBuilder:
@@ -82,6 +86,15 @@ class TestInteractiveBuilder:
         assert workflow.mode == "workflow"
         assert len(workflow.nodes) >= 3  # start, llm, end
     
+    def test_var_refs_follow_input_changes(self):
+        """Test prompt variable references are rebuilt when inputs change"""
+        builder = InteractiveBuilder()
+        builder.intent.input_variables = [{"name": "text", "type": "string", "required": True}]
+        assert builder._get_var_refs() == "- text: {{#start.text#}}"
+        
+        builder.intent.input_variables = [{"name": "query", "type": "string", "required": True}]
+        assert builder._get_var_refs() == "- query: {{#start.query#}}"
+    
     def test_build_chat_workflow(self):
         """Test building advanced-chat workflow"""
         builder = InteractiveBuilder()
@@ -143,6 +156,18 @@ class TestInteractiveBuilder:
         assert len(builder.intent.input_variables) == 1
         assert builder.intent.input_variables[0]["name"] == "input"
     
+    def test_processor_override_in_subclass(self):
+        """Test question processors dispatch to subclass overrides"""
+        class UpperInputsBuilder(InteractiveBuilder):
+            def parse_inputs(self, answer):
+                super().parse_inputs(answer.upper())
+        
+        builder = UpperInputsBuilder()
+        for answer in ("Test", "Test", "1", "text"):
+            builder.process_answer(answer)
+        
+        assert builder.intent.input_variables[0]["name"] == "TEXT"
+    
     def test_followup_questions(self):
         """Test follow-up questions for API/code details"""
         builder = InteractiveBuilder()
@@ -199,6 +224,23 @@ class TestVisualization:
         assert "AI" in output
         assert "End" in output
     
+    def test_visualize_tree_deep_chain(self):
+        """Test tree visualization of chains deeper than the recursion limit"""
+        from dify_workflow import Workflow, StartNode, CodeNode
+        
+        wf = Workflow("Deep")
+        prev = StartNode(title="Start")
+        wf.add_node(prev)
+        for i in range(1500):
+            node = CodeNode(title=f"step_{i}")
+            wf.add_node(node)
+            wf.connect(prev, node)
+            prev = node
+        
+        output = visualize(wf, "tree")
+        
+        assert "step_1499" in output
+    
     def test_visualize_ascii(self):
         """Test ASCII visualization"""
         from dify_workflow import Workflow, StartNode, EndNode
@@ -226,6 +268,223 @@ class TestVisualization:
         
         assert "graph TD" in output
         assert "-->" in output
+        assert f"    {start.id}((Start))\n" in output
+        assert f"    {end.id}[/End/]\n" in output
+    
+    def test_visualize_all(self):
+        """Test all formats are rendered and match the single-format output"""
+        from dify_workflow import Workflow, StartNode, EndNode, visualize_all
+        
+        wf = Workflow("Test")
+        start = StartNode(title="Start")
+        end = EndNode(title="End")
+        wf.add_nodes([start, end])
+        wf.connect(start, end)
+        
+        outputs = visualize_all(wf)
+        
+        assert set(outputs) == {"ascii", "tree", "mermaid"}
+        for fmt, output in outputs.items():
+            assert output == visualize(wf, fmt)
+
+
+class _FakeCompletions:
+    def __init__(self, content):
+        self.content = content
+        self.calls = []
+    
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _fake_client(content):
+    return SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(content)))
+
+
+class _FakeAsyncCompletions(_FakeCompletions):
+    async def create(self, **kwargs):
+        return _FakeCompletions.create(self, **kwargs)
+
+
+def _fake_async_client(content):
+    return SimpleNamespace(chat=SimpleNamespace(completions=_FakeAsyncCompletions(content)))
+
+
+class TestAIWorkflowBuilder:
+    """Test AI builder response handling with a stubbed client"""
+    
+    def test_chat_clarification(self):
+        builder = AIWorkflowBuilder()
+        builder._client = _fake_client(
+            '{"needs_clarification": true, "clarification_questions": ["Which language?"], '
+            '"workflow": {"name": "Draft"}}'
+        )
+        
+        complete, message, workflow = builder.chat("translate things")
+        
+        assert not complete
+        assert workflow is None
+        assert "- Which language?" in message
+    
+    def test_chat_builds_workflow(self):
+        builder = AIWorkflowBuilder()
+        builder._client = _fake_client(
+            '{"needs_clarification": false, "clarification_questions": [], '
+            '"workflow": {"name": "Translator", "steps": [{"type": "llm", "purpose": "translate"}]}}'
+        )
+        
+        complete, message, workflow = builder.chat("translate text")
+        
+        assert complete
+        assert workflow.name == "Translator"
+        assert "Generated workflow: Translator" in message
+    
+    def test_system_message_is_stable(self):
+        builder = AIWorkflowBuilder()
+        builder._client = _fake_client('{"needs_clarification": true, "clarification_questions": []}')
+        
+        builder.chat("first")
+        builder.chat("second")
+        
+        calls = builder._client.chat.completions.calls
+        assert calls[0]["messages"][0] == calls[1]["messages"][0]
+        assert calls[0]["messages"][0]["content"] == AIWorkflowBuilder.SYSTEM_PROMPT
+    
+    def test_anthropic_system_message_has_cache_control(self):
+        builder = AIWorkflowBuilder(base_url="https://api.anthropic.com/v1/")
+        
+        block = builder._system_msg["content"][0]
+        
+        assert block["text"] == AIWorkflowBuilder.SYSTEM_PROMPT
+        assert block["cache_control"] == {"type": "ephemeral"}
+    
+    def test_provider_overrides_url_detection(self):
+        proxied = AIWorkflowBuilder(base_url="https://llm-proxy.internal/v1", provider="anthropic")
+        plain = AIWorkflowBuilder(base_url="https://api.anthropic.com/v1/", provider="openai")
+        
+        assert proxied._system_msg["content"][0]["cache_control"] == {"type": "ephemeral"}
+        assert plain._system_msg["content"] == AIWorkflowBuilder.SYSTEM_PROMPT
+    
+    def test_chat_structured_intent_skips_llm(self):
+        builder = AIWorkflowBuilder()
+        builder._client = _fake_client("not used")
+        
+        complete, _, workflow = builder.chat(
+            '{"workflow": {"name": "Direct", "steps": [{"type": "llm"}]}}'
+        )
+        
+        assert complete
+        assert workflow.name == "Direct"
+        assert builder._client.chat.completions.calls == []
+    
+    def test_abuild_from_description(self):
+        builder = AIWorkflowBuilder()
+        builder._aclient = _fake_async_client(
+            '{"needs_clarification": false, "workflow": {"name": "Async", "steps": []}}'
+        )
+        
+        workflow = asyncio.run(builder.abuild_from_description("anything"))
+        
+        assert workflow.name == "Async"
+    
+    def test_abuild_many_keeps_conversations_separate(self):
+        builder = AIWorkflowBuilder()
+        builder._aclient = _fake_async_client(
+            '{"needs_clarification": false, "workflow": {"name": "Batch", "steps": []}}'
+        )
+        
+        workflows = asyncio.run(builder.abuild_many(["one", "two", "three"], concurrency=2))
+        
+        assert [wf.name for wf in workflows] == ["Batch"] * 3
+        for call in builder._aclient.chat.completions.calls:
+            user_messages = [m for m in call["messages"] if m["role"] == "user"]
+            assert len(user_messages) == 1
+    
+    def test_abuild_many_uses_builder_subclass(self):
+        class TaggedBuilder(AIWorkflowBuilder):
+            def _build_from_intent(self, intent):
+                workflow = super()._build_from_intent(intent)
+                workflow.name = "Tagged " + workflow.name
+                return workflow
+        
+        builder = TaggedBuilder(intent_cache=IntentCache())
+        builder.intent_cache.store("cached", {"name": "Hit", "steps": []})
+        builder._aclient = _fake_async_client("not used")
+        
+        workflows = asyncio.run(builder.abuild_many(["cached"]))
+        
+        assert workflows[0].name == "Tagged Hit"
+    
+    def test_intent_cache_skips_repeat_descriptions(self):
+        cache = IntentCache()
+        builder = AIWorkflowBuilder(intent_cache=cache)
+        builder._client = _fake_client(
+            '{"needs_clarification": false, "workflow": {"name": "Cached", "steps": []}}'
+        )
+        
+        first = builder.build_from_description("Translate  text")
+        second = builder.build_from_description("translate text")
+        
+        assert first.name == second.name == "Cached"
+        assert len(builder._client.chat.completions.calls) == 1
+    
+    def test_intent_cache_ignores_multi_turn_conversations(self):
+        cache = IntentCache()
+        builder = AIWorkflowBuilder(intent_cache=cache)
+        builder._client = _fake_client('{"needs_clarification": true, "clarification_questions": ["Model?"]}')
+        builder.chat("translate text")
+        builder._client = _fake_client(
+            '{"needs_clarification": false, "workflow": {"name": "Clarified", "steps": []}}'
+        )
+        
+        builder.parse_intent("yes, use GPT-4")
+        
+        assert cache.lookup("yes, use GPT-4") is None
+    
+    def test_intent_cache_semantic_hit(self):
+        vectors = {"summarize articles": [1.0, 0.0], "summarise articles": [0.99, 0.05], "other": [0.0, 1.0]}
+        cache = IntentCache(embed=vectors.__getitem__, similarity_threshold=0.9)
+        cache.store("summarize articles", {"name": "Summary"})
+        
+        assert cache.lookup("summarise articles") == {"name": "Summary"}
+        assert cache.lookup("other") is None
+        assert cache.lookup("summarise articles", lang="zh") is None
+    
+    def test_intent_cache_embeds_once_per_miss(self):
+        embedded = []
+        cache = IntentCache(embed=lambda text: embedded.append(text) or [1.0, 0.0])
+        builder = AIWorkflowBuilder(intent_cache=cache)
+        builder._client = _fake_client(
+            '{"needs_clarification": false, "workflow": {"name": "Cached", "steps": []}}'
+        )
+        cache.store("seed", {"name": "Other"}, lang="zh")
+        embedded.clear()
+        
+        builder.parse_intent("translate text")
+        
+        assert embedded == ["translate text"]
+        assert len(builder._client.chat.completions.calls) == 1
+    
+    def test_intent_cache_returns_copies(self):
+        cache = IntentCache()
+        intent = {"name": "Original", "steps": [{"type": "llm"}]}
+        cache.store("describe", intent)
+        intent["steps"].append({"type": "code"})
+        
+        hit = cache.lookup("describe")
+        hit["steps"][0]["type"] = "http"
+        
+        assert cache.lookup("describe") == {"name": "Original", "steps": [{"type": "llm"}]}
+    
+    def test_intent_cache_evicts_oldest(self):
+        cache = IntentCache(max_entries=1)
+        cache.store("a", {"name": "A"})
+        cache.store("b", {"name": "B"})
+        
+        assert cache.lookup("a") is None
+        assert cache.lookup("b") == {"name": "B"}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,244 @@
+"""
+Tests for the workflow marketplace
+"""
+
+import pytest
+from types import SimpleNamespace
+
+pytest.importorskip("sqlalchemy")
+
+from dify_workflow import Workflow
+from dify_workflow.database import WorkflowDatabase
+from dify_workflow.marketplace import WorkflowEntry, WorkflowMarketplace
+
+
+def _record(i, author, tags):
+    timestamp = f"2024-01-{i + 1:02d}T00:00:00"
+    return {
+        "id": f"wf{i}",
+        "name": f"Workflow {i}",
+        "description": "demo",
+        "created_by": author,
+        "tags": tags,
+        "created_at": timestamp,
+        "updated_at": timestamp,
+    }
+
+
+@pytest.fixture
+def marketplace():
+    records = [
+        _record(0, "alice", ["nlp"]),
+        _record(1, "bob", ["nlp", "chat"]),
+        _record(2, "alice", ["chat"]),
+        _record(3, "bob", ["data"]),
+    ]
+    db = SimpleNamespace(
+        list_workflows=lambda **kwargs: records,
+        increment_downloads=lambda workflow_id: True,
+    )
+    return WorkflowMarketplace(db=db)
+
+
+class TestWorkflowMarketplace:
+    def test_search_filters_by_index(self, marketplace):
+        results = marketplace.search_workflows(tags=["chat"], author="alice")
+        assert [e.id for e in results] == ["wf2"]
+
+    def test_search_recent_order_and_limit(self, marketplace):
+        results = marketplace.search_workflows(sort_by="recent", limit=2)
+        assert [e.id for e in results] == ["wf3", "wf2"]
+
+    def test_search_query_substring(self, marketplace):
+        results = marketplace.search_workflows(query="WORKFLOW 1")
+        assert [e.id for e in results] == ["wf1"]
+
+    def test_popular_tags(self, marketplace):
+        assert marketplace.get_popular_tags(limit=2) == [("nlp", 2), ("chat", 2)]
+
+    def test_download_returns_isolated_workflows(self, marketplace):
+        entry = marketplace.search_workflows(query="workflow 0")[0]
+        entry.workflow_data = Workflow("Downloaded").to_dict()
+        marketplace._local_cache[entry.id] = entry
+
+        first = marketplace.download_workflow(entry.id)
+        first.name = "mutated"
+        second = marketplace.download_workflow(entry.id)
+
+        assert second.name == "Downloaded"
+
+    def test_increment_downloads_updates_index_in_place(self, marketplace):
+        marketplace.search_workflows()
+        marketplace._increment_downloads("wf0")
+        results = marketplace.search_workflows(sort_by="downloads", limit=1)
+        assert results[0].id == "wf0"
+        assert results[0].downloads == 1
+
+    def test_entries_without_timestamps_sort_last(self, marketplace):
+        marketplace.search_workflows()
+        marketplace._index_entry(WorkflowEntry("undated", "Undated", "", "carol", "1.0.0"))
+
+        results = marketplace.search_workflows(sort_by="recent")
+        assert [e.id for e in results] == ["wf3", "wf2", "wf1", "wf0", "undated"]
+
+
+class TestDatabaseCounters:
+    def test_increment_and_rate(self):
+        db = WorkflowDatabase("sqlite://")
+        workflow_id = db.save_workflow(Workflow("Counted"))
+
+        assert db.increment_downloads(workflow_id)
+        assert db.set_rating(workflow_id, 4.5)
+        assert not db.increment_downloads("missing")
+
+        record = db.load_workflow(workflow_id)
+        assert record["downloads"] == 1
+        assert record["rating"] == 4.5
+
+    def test_search_uses_full_text_index(self):
+        db = WorkflowDatabase("sqlite://")
+        first = db.save_workflow(Workflow("Translate documents"))
+        db.save_workflow(Workflow("Summarize news"))
+        db.save_workflow(Workflow("Translate", description="renamed later"), workflow_id=first)
+
+        assert [r["id"] for r in db.search_workflows("RANSLA")] == [first]
+        assert [r["id"] for r in db.search_workflows("renamed")] == [first]
+        assert db.search_workflows("documents") == []
+
+
+class TestMarketplaceRoundTrip:
+    def test_publish_and_download(self):
+        db = WorkflowDatabase("sqlite://")
+        workflow = Workflow("Translator")
+        workflow_id = WorkflowMarketplace(db=db).publish_workflow(workflow, "alice", tags=["nlp"])
+
+        marketplace = WorkflowMarketplace(db=db)
+        entry = marketplace.get_workflow(workflow_id)
+        assert isinstance(entry._serialized, str)
+
+        downloaded = marketplace.download_workflow(workflow_id)
+        assert downloaded.name == "Translator"
+        assert entry.workflow_data["app"]["name"] == "Translator"
+        assert marketplace.get_workflow(workflow_id).downloads == 1
+
+    def test_second_instance_sees_later_publishes(self):
+        db = WorkflowDatabase("sqlite://")
+        publisher = WorkflowMarketplace(db=db)
+        reader = WorkflowMarketplace(db=db)
+        alpha = publisher.publish_workflow(Workflow("Alpha"), "alice", tags=["first"])
+        assert [e.id for e in reader.search_workflows()] == [alpha]
+
+        beta = publisher.publish_workflow(Workflow("Beta"), "bob", tags=["second"])
+
+        assert [e.id for e in reader.search_workflows(query="Beta")] == [beta]
+        assert [e.id for e in reader.search_workflows(author="bob")] == [beta]
+        assert ("second", 1) in reader.get_popular_tags()
+
+    def test_query_does_not_match_stored_name_prefix(self):
+        db = WorkflowDatabase("sqlite://")
+        workflow_id = WorkflowMarketplace(db=db).publish_workflow(Workflow("Translator"), "alice")
+
+        marketplace = WorkflowMarketplace(db=db)
+
+        assert marketplace.search_workflows(query="MARKETPLACE") == []
+        assert marketplace.search_workflows(query="general") == []
+        assert [e.id for e in marketplace.search_workflows(query="translat")] == [workflow_id]
+
+    def test_own_writes_do_not_reload_index(self, monkeypatch):
+        db = WorkflowDatabase("sqlite://")
+        marketplace = WorkflowMarketplace(db=db)
+        list_calls = []
+        list_workflows = db.list_workflows
+        monkeypatch.setattr(db, "list_workflows", lambda **kw: list_calls.append(kw) or list_workflows(**kw))
+
+        marketplace.search_workflows()
+        for i in range(5):
+            workflow_id = marketplace.publish_workflow(Workflow(f"Own {i}"), "alice", tags=["own"])
+            marketplace.download_workflow(workflow_id)
+            marketplace.rate_workflow(workflow_id, 5, "bob")
+            assert len(marketplace.search_workflows()) == i + 1
+        assert marketplace.get_popular_tags() == [("own", 5)]
+        assert len(list_calls) == 1
+
+        WorkflowMarketplace(db=db).publish_workflow(Workflow("Foreign"), "carol")
+        assert len(marketplace.search_workflows()) == 6
+        assert len(list_calls) == 2
+
+    def test_loaded_entries_keep_name_and_category(self):
+        db = WorkflowDatabase("sqlite://")
+        workflow_id = WorkflowMarketplace(db=db).publish_workflow(
+            Workflow("Translator"), "alice", category="nlp"
+        )
+
+        marketplace = WorkflowMarketplace(db=db)
+        entry = marketplace.get_workflow(workflow_id)
+
+        assert (entry.name, entry.category) == ("Translator", "nlp")
+        assert [e.id for e in marketplace.search_workflows(query="Tr", category="nlp")] == [workflow_id]
+        assert marketplace.search_workflows(query="Tr", category="general") == []
+
+
+class TestLocalWorkflowHub:
+    def test_list_uses_sidecar_index(self, tmp_path, monkeypatch):
+        from dify_workflow.marketplace import LocalWorkflowHub
+
+        hub = LocalWorkflowHub(str(tmp_path / "hub"))
+        hub.add_workflow(Workflow("First"), "first.yml")
+        hub.add_workflow(Workflow("Second"), "second.yml")
+
+        listed = {w["filename"]: w["name"] for w in hub.list_workflows()}
+        assert listed == {"first.yml": "First", "second.yml": "Second"}
+        assert hub.index_path.exists()
+
+        # Unchanged files are served from the index without re-parsing
+        monkeypatch.setattr("dify_workflow.marketplace.yaml.safe_load", None)
+        assert len(hub.list_workflows()) == 2
+
+        (tmp_path / "hub" / "first.yml").unlink()
+        assert [w["filename"] for w in hub.list_workflows()] == ["second.yml"]
+
+    def test_bulk_publish(self):
+        db = WorkflowDatabase("sqlite://")
+        marketplace = WorkflowMarketplace(db=db)
+
+        ids = marketplace.bulk_publish(
+            [Workflow(f"Bulk {i}") for i in range(5)], "alice", tags=["bulk"]
+        )
+
+        assert len(set(ids)) == 5
+        assert all(db.load_workflow(workflow_id) for workflow_id in ids)
+        assert marketplace.get_popular_tags() == [("bulk", 5)]
+
+    def test_local_cache_is_bounded(self):
+        db = WorkflowDatabase("sqlite://")
+        ids = WorkflowMarketplace(db=db).bulk_publish(
+            [Workflow("A"), Workflow("B")], "alice"
+        )
+
+        marketplace = WorkflowMarketplace(db=db, cache_maxsize=1)
+        for workflow_id in ids:
+            marketplace.get_workflow(workflow_id)
+
+        assert list(marketplace._local_cache) == [ids[1]]
+
+    def test_read_only_download_shares_instance(self):
+        db = WorkflowDatabase("sqlite://")
+        marketplace = WorkflowMarketplace(db=db)
+        workflow_id = marketplace.publish_workflow(Workflow("Shared"), "alice")
+
+        first = marketplace.download_workflow(workflow_id, mutable=False)
+        second = marketplace.download_workflow(workflow_id, mutable=False)
+
+        assert first is second
+        assert marketplace.download_workflow(workflow_id) is not first
+
+    def test_content_addressed_publish_dedupes(self):
+        db = WorkflowDatabase("sqlite://")
+        marketplace = WorkflowMarketplace(db=db)
+
+        first = marketplace.publish_workflow(Workflow("Same"), "alice", content_addressed=True)
+        second = marketplace.publish_workflow(Workflow("Same"), "bob", content_addressed=True)
+        other = marketplace.publish_workflow(Workflow("Other"), "alice", content_addressed=True)
+
+        assert first == second != other
+        assert len(db.list_workflows()) == 2
@@ -0,0 +1,123 @@
+"""
+Tests for workflow migration tools
+"""
+
+import datetime
+import json
+
+import pytest
+import yaml
+from dify_workflow.migration import DifyVersionMigrator, LangchainMigrator, MakeMigrator, WorkflowMigrator
+
+
+class TestLangchainMigrator:
+    def test_extracts_prompt(self):
+        code = 'chain = LLMChain(llm=llm, prompt="Summarize {text}")'
+        result = LangchainMigrator().migrate(code)
+
+        llm = result["workflow"]["graph"]["nodes"][1]
+        assert llm["data"]["prompt"] == "Summarize {text}"
+
+    def test_prompt_ends_at_matching_quote(self):
+        code = 'chain = LLMChain(llm=llm, prompt="It\'s a \\"test\\"")'
+        result = LangchainMigrator().migrate(code)
+
+        llm = result["workflow"]["graph"]["nodes"][1]
+        assert llm["data"]["prompt"] == 'It\'s a \\"test\\"'
+
+    def test_default_prompt_without_assignment(self):
+        result = LangchainMigrator().migrate("chain = prompt_tmpl | llm")
+
+        llm = result["workflow"]["graph"]["nodes"][1]
+        assert llm["data"]["prompt"] == "{{#start.input#}}"
+
+    def test_non_chain_code_has_no_nodes(self):
+        result = LangchainMigrator().migrate("x = 1")
+        assert result["workflow"]["graph"]["nodes"] == []
+
+
+class TestMakeMigrator:
+    def test_compact_form_expands_to_full_workflow(self):
+        scenario = {
+            "name": "Scenario",
+            "modules": [{"type": "http:ActionSendData", "name": "Fetch"}, {"type": "openai:Chat"}],
+        }
+        migrator = MakeMigrator()
+
+        compact = migrator.migrate_compact(scenario)
+
+        assert compact == ("Scenario", (("http", "Fetch", ""), ("llm", "Node 1", "")))
+        assert migrator.expand(compact) == migrator.migrate(scenario)
+        assert migrator.migrate(scenario)["workflow"]["graph"]["edges"] == [
+            {"source": "node_0", "target": "node_1"}
+        ]
+
+
+class TestDifyVersionMigrator:
+    def test_migrates_to_latest(self):
+        source = {"version": "0.1.0", "workflow": {"graph": {"nodes": [{"id": "a", "data": {}}]}}}
+        result = DifyVersionMigrator().migrate(source)
+
+        assert result["version"] == "0.5.0"
+        assert result["kind"] == "app"
+        assert result["app"]["tags"] == []
+        assert result["workflow"]["graph"]["nodes"][0]["data"]["selected"] is False
+
+    def test_rejects_unknown_version(self):
+        with pytest.raises(ValueError, match="Unknown source version"):
+            DifyVersionMigrator().migrate({"version": "9.9.9"})
+
+    def test_does_not_mutate_input(self):
+        source = {
+            "version": "0.1.0",
+            "app": {"name": "Orig"},
+            "workflow": {"graph": {"nodes": [{"id": "a", "data": {}}], "edges": []}},
+        }
+        DifyVersionMigrator().migrate(source)
+
+        assert source["version"] == "0.1.0"
+        assert source["app"] == {"name": "Orig"}
+        assert source["workflow"]["graph"]["nodes"][0]["data"] == {}
+
+    def test_source_cache_returns_copies(self):
+        source = yaml.dump({"version": "0.4.0", "app": {"name": "Cached"}})
+        migrator = WorkflowMigrator()
+
+        first = migrator.migrate(source, "dify")
+        first["app"]["name"] = "mutated"
+        second = migrator.migrate(source, "dify")
+
+        assert second["app"]["name"] == "Cached"
+        assert migrator.dify_migrator.cache_info()["hits"] == 1
+
+    def test_source_cache_keeps_yaml_types(self):
+        source = "version: 0.4.0\napp:\n  name: Dated\n  created: 2024-01-01\n  1: one\n"
+        migrator = DifyVersionMigrator()
+
+        first = migrator.migrate_source(source)
+        second = migrator.migrate_source(source)
+
+        assert first["app"]["created"] == datetime.date(2024, 1, 1)
+        assert second == first
+        assert second["app"][1] == "one"
+        assert migrator.cache_info()["hits"] == 1
+
+    def test_migrates_json_file(self, tmp_path):
+        path = tmp_path / "workflow.json"
+        path.write_text('{"version": "0.4.0", "app": {"name": "Datei"}}', encoding="utf-8")
+
+        result = WorkflowMigrator().migrate(str(path), "dify")
+
+        assert result["version"] == "0.5.0"
+        assert result["app"]["name"] == "Datei"
+
+    def test_long_single_line_source_is_not_a_path(self):
+        source = json.dumps({"version": "0.4.0", "app": {"name": "x" * 300}})
+
+        result = WorkflowMigrator().migrate(source, "dify")
+
+        assert result["app"]["name"] == "x" * 300
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,64 @@
+"""
+Tests for workflow optimizer
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from dify_workflow.optimizer import OptimizationType, Severity, WorkflowOptimizer
+
+
+def make_node(node_id, node_type, **data):
+    return SimpleNamespace(id=node_id, type=node_type, data=data)
+
+
+class TestWorkflowOptimizer:
+    def test_rules_only_run_on_matching_node_types(self):
+        wf = SimpleNamespace(name="wf", nodes=[
+            make_node("s", "start"),
+            make_node("h", "http", retry=True),
+        ])
+
+        report = WorkflowOptimizer().analyze(wf)
+
+        assert [(s.id, s.node_id) for s in report.suggestions] == [("caching", "h")]
+
+    def test_malformed_llm_values_are_not_flagged(self):
+        wf = SimpleNamespace(name="wf", nodes=[
+            make_node("l", "llm", model="gpt-4", temperature=None, prompt=None, cache_enabled=True),
+        ])
+
+        report = WorkflowOptimizer().analyze(wf)
+
+        assert report.suggestions == []
+        assert report.original_score == 100
+
+    def test_rules_added_after_construction_are_applied(self):
+        optimizer = WorkflowOptimizer()
+        optimizer.rules.append({
+            "id": "custom", "type": OptimizationType.STRUCTURE, "severity": Severity.LOW,
+            "title": "Custom", "description": "", "applies_to": ["all"],
+            "check": lambda node: True, "suggestion": None,
+        })
+        wf = SimpleNamespace(name="wf", nodes=[make_node("s", "start")])
+
+        report = optimizer.analyze(wf)
+
+        assert [s.id for s in report.suggestions] == ["custom"]
+        assert report.summary == {"critical": 0, "high": 0, "medium": 0, "low": 1, "info": 0}
+
+    def test_auto_apply_updates_matching_clone_nodes(self):
+        nodes = [make_node("h1", "http", retry=True), make_node("h2", "http", retry=True)]
+        wf = SimpleNamespace(name="wf", nodes=nodes)
+        wf.clone = lambda: SimpleNamespace(
+            name="wf", nodes=[make_node(n.id, n.type, **n.data) for n in nodes]
+        )
+
+        optimized, _ = WorkflowOptimizer().optimize(wf, auto_apply=True)
+
+        assert [n.data.get("cache_enabled") for n in optimized.nodes] == [True, True]
+        assert all("cache_enabled" not in n.data for n in nodes)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -66,6 +66,22 @@ class TestWorkflow:
         assert len(data["workflow"]["graph"]["nodes"]) == 2
         assert len(data["workflow"]["graph"]["edges"]) == 1
     
+    def test_from_dict_round_trip(self):
+        """Test rebuilding a workflow from its DSL"""
+        wf = Workflow("Test", mode="workflow")
+        start = StartNode(variables=[{"name": "query", "type": "string"}])
+        llm = LLMNode(prompt="{{#start.query#}}")
+        end = EndNode()
+        wf.add_nodes([start, llm, end])
+        wf.connect(start, llm)
+        wf.connect(llm, end)
+        
+        data = wf.to_dict()
+        restored = Workflow.from_dict(data)
+        
+        assert restored.to_dict() == data
+        assert restored.validate() == []
+    
     def test_to_yaml(self):
         """Test YAML export"""
         wf = Workflow("Test")
@@ -111,6 +127,13 @@ class TestNodes:
         assert len(data["data"]["variables"]) == 1
         assert data["data"]["variables"][0]["variable"] == "query"
     
+    def test_node_json_bytes(self):
+        """Test compact JSON output matches to_dict"""
+        import json
+
+        node = LLMNode(title="Übersetzen", prompt="Hallo")
+        assert json.loads(node.to_json_bytes()) == node.to_dict()
+    
     def test_llm_node(self):
         """Test LLMNode"""
         node = LLMNode(